@@ -8,10 +8,11 @@ import traceback
 
 # --- Import your schemas (data models) ---
 from ..schemas import AnalysisRequest, AnalysisResult # Only import schemas directly used by this endpoint
+from ..responses import model_json_response
 
 # --- Import the new modular components ---
-from ..database.repository import AnalysisRepository
-from ..core.analyzer import run_full_analysis
+from ..database.repository import AnalysisRepository, get_analysis_repository
+from ..core.analyzer import run_full_analysis_cached
 from ..core.result_processor import process_analysis_data
 
 # --- IMPORTANT: Correct Import for Authentication Dependency ---
@@ -28,16 +29,6 @@ logger = logging.getLogger("accessibility_analyzer_backend.api.analyze")
 current_user_dependency = Depends(get_current_user_firebase)
 
 
-# --- Dependency for AnalysisRepository ---
-async def get_analysis_repository() -> AnalysisRepository:
-    """
-    Dependency that provides an instance of AnalysisRepository.
-    This ensures the repository is initialized *after* the MongoDB connection
-    is established in the application's startup event.
-    """
-    return AnalysisRepository()
-
-
 @router.post(
     "/analyze",
     response_model=AnalysisResult,
@@ -65,12 +56,13 @@ async def analyze_url(
         cached_result = await analysis_repo.get_analysis_by_url_and_user(url, user_id)
         if cached_result:
             logger.info(f"Cache Hit: Returning cached analysis for URL: {url} | User: {user_id} | Report ID: {cached_result.id}")
-            return cached_result
+            return model_json_response(cached_result, status_code=status.HTTP_201_CREATED)
         else:
             logger.info(f"Cache Miss: No cached analysis found for URL: {url} | User: {user_id}. Performing new analysis.")
 
         # --- Perform new analysis ---
-        issues_list, page_html_content, page_title = await run_full_analysis(url)
+        # Reuses another user's scan of the same page when its ETag / Last-Modified is unchanged
+        issues_list, page_html_content, page_title = await run_full_analysis_cached(url)
         
         # --- Process analysis data into final AnalysisResult model ---
         final_result = process_analysis_data(url, user_id, issues_list, page_html_content, page_title)
@@ -79,7 +71,7 @@ async def analyze_url(
         saved_result = await analysis_repo.save_analysis_result(final_result)
         logger.info(f"Analysis process completed successfully and saved for URL: {url} | User: {user_id} | Report ID: {saved_result.id}")
         
-        return saved_result
+        return model_json_response(saved_result, status_code=status.HTTP_201_CREATED)
 
     except HTTPException:
         # Re-raise HTTPExceptions directly, as they are intentional errors
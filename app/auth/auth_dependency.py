@@ -1,5 +1,6 @@
 # backend/app/auth/auth_dependency.py
 
+import asyncio
 from fastapi import Header, HTTPException, status
 from typing import Optional
 import firebase_admin
@@ -42,7 +43,10 @@ async def get_current_user_firebase(authorization: Optional[str] = Header(None))
         
         logger.debug(f"Attempting to verify token (first 50 chars): {token[:50]}...")
         
-        decoded_token = auth.verify_id_token(token)
+        # verify_id_token is synchronous: it checks the RSA signature and, when its cached copy has
+        # expired, downloads Google's public certificates over HTTP. Run it in a worker thread so
+        # one slow verification does not stall every other request on the event loop.
+        decoded_token = await asyncio.to_thread(auth.verify_id_token, token)
         uid = decoded_token["uid"]
 
         logger.info(f"Firebase token successfully verified for user: {uid}")
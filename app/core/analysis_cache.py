@@ -0,0 +1,95 @@
+# backend/app/core/analysis_cache.py
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import httpx
+from pydantic import HttpUrl
+
+from ..schemas import Issue
+
+logger = logging.getLogger("accessibility_analyzer_backend.core.analysis_cache")
+
+# Process-wide cache of run_full_analysis results, shared by all users (the per-user report
+# cache in MongoDB only helps a user who already analyzed the URL).
+# A cached result is reused only while the server vouches that the page has not changed:
+# alongside the scan, a HEAD request fetches the URL's validators (ETag / Last-Modified), and an
+# entry stored under the same URL and validators is returned in place of the scan.
+# Only the issues and the title are kept; the page HTML is not used once the rules have run
+# (process_analysis_data does not store it), so a hit returns "" for it.
+# Pages that send neither header (most dynamic pages) are never cached, and entries also
+# expire after ANALYSIS_CACHE_TTL_SECONDS, since scripts can change a page whose HTML did not.
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "128"))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "600"))
+# The validator check must stay much cheaper than a scan; give up on slow servers
+VALIDATOR_TIMEOUT_SECONDS = 5.0
+
+AnalysisOutput = Tuple[List[Issue], str, str] # (issues, page HTML, page title), as run_full_analysis returns
+Validators = Tuple[str, str] # (ETag, Last-Modified); an empty string for a missing header
+
+# url -> (validators, stored_at monotonic time, issues, page title)
+_analysis_cache: "OrderedDict[str, Tuple[Validators, float, List[Issue], str]]" = OrderedDict()
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """Returns the shared AsyncClient for validator requests, creating it if needed (or closed)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=VALIDATOR_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        )
+    return _client
+
+async def close_analysis_cache_client() -> None:
+    """Closes the shared validator client; called from the app's shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def fetch_validators(url: HttpUrl) -> Optional[Validators]:
+    """
+    Sends a HEAD request for `url` and returns its (ETag, Last-Modified) validators, or None
+    when the request fails or the response carries neither header (the page is not cacheable).
+    """
+    try:
+        response = await _get_client().head(str(url))
+    except Exception as e:
+        # Best effort: any failure (network, invalid URL for httpx, ...) just means "not cacheable"
+        logger.debug(f"Validator request failed for URL: {url}. Error: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    validators = (response.headers.get("etag", ""), response.headers.get("last-modified", ""))
+    return validators if any(validators) else None
+
+def get_cached_analysis(url: HttpUrl, validators: Validators) -> Optional[AnalysisOutput]:
+    """Returns the cached analysis of `url` if it was stored under the same validators and has not expired."""
+    key = str(url)
+    entry = _analysis_cache.get(key)
+    if entry is None:
+        return None
+    cached_validators, stored_at, issues, page_title = entry
+    if cached_validators != validators or time.monotonic() - stored_at > ANALYSIS_CACHE_TTL_SECONDS:
+        del _analysis_cache[key] # The page changed or the entry is stale
+        return None
+    _analysis_cache.move_to_end(key)
+    # A new list per caller; the Issue models themselves are never mutated after the analysis
+    return list(issues), "", page_title
+
+def cache_analysis(url: HttpUrl, validators: Validators, output: AnalysisOutput) -> None:
+    """
+    Stores an analysis of `url` (without its page HTML) under its validators, evicting the
+    least recently used entry if full.
+    """
+    key = str(url)
+    issues, _, page_title = output
+    _analysis_cache[key] = (validators, time.monotonic(), list(issues), page_title)
+    _analysis_cache.move_to_end(key)
+    if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
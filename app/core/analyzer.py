@@ -3,29 +3,73 @@ import asyncio
 import traceback
 from typing import List, Tuple, Dict, Any, Optional
 from pydantic import HttpUrl
-from bs4 import BeautifulSoup
 
 # Import services for browser automation and Axe scanning
-from ..services.browser import get_browser_context_and_page, close_browser_context
+from ..services.browser import get_browser_context_and_page, close_browser_context, goto_for_analysis
 from ..services.axe_runner import run_axe_scan
-from ..services.ai_helper import get_ai_suggestions
+from ..services.ai_helper import get_ai_suggestions_batch
+from ..services.rule_fixes import RULE_FIXES
+from .analysis_cache import Validators, cache_analysis, fetch_validators, get_cached_analysis
 
 # Import your custom accessibility rules
 from ..rules.alt_text import check_alt_text
-from ..rules.headings import check_heading_structure
 from ..rules.labels import check_form_labels
-from ..rules.contrast import check_color_contrast
-from ..rules.empty_interactive import check_empty_interactive_elements
-from ..rules.document_language import check_document_language
-from ..rules.descriptive_link_text import check_descriptive_link_text
 from ..rules.media_captions import check_media_captions
+# Headings, contrast, empty interactive elements, document language and link text in one DOM walk
+from ..rules.combined import check_all
+from ..rules._parse import parse
 
 # Import your schemas (data models)
-from ..schemas import Issue, AiSuggestion, IssueNode
+from ..schemas import Issue, AiSuggestion
 from playwright.async_api import BrowserContext, Page # For type hinting
 
 logger = logging.getLogger("accessibility_analyzer_backend.core.analyzer")
 
+def _run_custom_rules(page_html_content: str) -> List[List[Issue]]:
+    """
+    Parses the page once and runs every custom rule on the shared tree.
+    Pure CPU work with no awaits, so run_full_analysis runs it in a worker thread
+    while the event loop waits on the Axe-core scan in the browser.
+    The tree is local to this call, so it is freed as soon as the rules finish instead of being
+    held through the AI suggestion round trips that follow.
+    """
+    page_tree = parse(page_html_content)
+    return [
+        check_alt_text(page_html_content, tree=page_tree),
+        check_all(page_html_content, tree=page_tree),
+        check_form_labels(page_html_content, tree=page_tree),
+        check_media_captions(page_html_content, tree=page_tree),
+    ]
+
+async def run_axe_scan_batch(urls: List[str], concurrency: int = 5) -> List[List[Dict[str, Any]]]:
+    """
+    Runs Axe-core scans for many URLs concurrently on the shared browser, one context per URL,
+    with at most `concurrency` scans in flight (the browser's own context cap also applies).
+    A URL that fails to load or scan is logged and yields an empty list, so one bad page does
+    not abort the batch.
+
+    Returns:
+        List[List[Dict[str, Any]]]: The run_axe_scan result for each URL, in input order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def scan_one(url: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            context: Optional[BrowserContext] = None
+            page: Optional[Page] = None
+            try:
+                context, page = await get_browser_context_and_page("chromium")
+                await goto_for_analysis(page, url)
+                return await run_axe_scan(page)
+            except Exception as e:
+                logger.error(f"Axe-core batch scan failed for URL: {url}. Error: {e}")
+                return []
+            finally:
+                if context:
+                    await close_browser_context(context, page)
+
+    return list(await asyncio.gather(*(scan_one(url) for url in urls)))
+
 async def run_full_analysis(url: HttpUrl) -> Tuple[List[Issue], str, str]:
     """
     Orchestrates the full accessibility analysis process for a given URL.
@@ -55,66 +99,55 @@ async def run_full_analysis(url: HttpUrl) -> Tuple[List[Issue], str, str]:
         # Use a context manager to ensure browser context is closed
         context, page = await get_browser_context_and_page("chromium") # Or configurable browser type
         
-        await page.goto(str(url), wait_until="domcontentloaded", timeout=120000) # Increased timeout to 90 seconds (90000ms)# Wait for network to be idle
-        page_html_content = await page.content() # Get full HTML content
-        logger.info(f"Successfully loaded page content for URL: {url}")
+        # Returns once the HTML is parsed; only app shells also wait for DOMContentLoaded and rendering
+        await goto_for_analysis(page, str(url))
 
-        # Extract page title using Playwright's API
+        # --- Run Axe-core scan and custom rules concurrently ---
+        logger.info(f"Running Axe-core scan for URL: {url}")
+        # axe is preloaded by the context's init script, so the scan starts right away and runs in
+        # the browser while the HTML and title are fetched and the custom rules run below.
+        axe_task = asyncio.create_task(run_axe_scan(page))
         try:
-            page_title = await page.title()
-            if page_title:
-                page_title = page_title.strip()
+            page_html_content, title_result = await asyncio.gather(
+                page.content(), # Get full HTML content
+                page.title(),
+                return_exceptions=True
+            )
+            if isinstance(page_html_content, BaseException):
+                raise page_html_content
+            logger.info(f"Successfully loaded page content for URL: {url}")
+
+            # Extract page title using Playwright's API
+            if isinstance(title_result, BaseException):
+                logger.warning(f"Failed to extract page title for URL: {url}. Error: {title_result}")
+                page_title = "N/A" # Ensure page_title is set even on error
+            elif title_result:
+                page_title = title_result.strip()
                 logger.info(f"Extracted page title: '{page_title}' for URL: {url}")
             else:
                 page_title = "N/A" # Fallback if title is empty
-        except Exception as title_e:
-            logger.warning(f"Failed to extract page title for URL: {url}. Error: {title_e}")
-            page_title = "N/A" # Ensure page_title is set even on error
 
-        # --- Run Axe-core scan ---
-        logger.info(f"Running Axe-core scan for URL: {url}")
-        axe_violations_raw = await run_axe_scan(page) # Await the async function
+            logger.info("Running custom accessibility rules.")
+            # The custom rules (which only need the HTML we already have) run in a worker thread
+            # while the Axe scan is still waiting on the browser, instead of afterwards.
+            custom_rule_checks = await asyncio.to_thread(_run_custom_rules, page_html_content)
+            axe_violations_raw = await axe_task
+        finally:
+            if not axe_task.done():
+                axe_task.cancel() # Fetching the page content failed; don't leave the scan running
         logger.info(f"Axe-core scan completed. Found {len(axe_violations_raw)} raw violations.")
 
+        # run_axe_scan already returns issue-shaped dicts (severity, nodes with html/target/
+        # failureSummary), so each one is validated in a single pydantic-core call instead of
+        # copying every field into IssueNode/Issue constructors. Extra keys such as node_count are ignored.
         for viol in axe_violations_raw:
             try:
-                parsed_nodes = []
-                for node_data in viol.get('nodes', []):
-                    parsed_nodes.append(IssueNode(
-                        html=node_data.get('html'),
-                        target=node_data.get('target', []),
-                        snippet=node_data.get('snippet'),
-                        failureSummary=node_data.get('failureSummary'),
-                        xpath=node_data.get('xpath')
-                    ))
-
-                issues_list.append(Issue(
-                    id=viol.get('id', 'unknown-id'),
-                    description=viol.get('description', 'No description'),
-                    help=viol.get('help', 'No help provided'),
-                    helpUrl=viol.get('helpUrl'),
-                    severity=viol.get('impact', 'minor'), # Axe-core uses 'impact' for severity
-                    tags=viol.get('tags', []),
-                    nodes=parsed_nodes
-                ))
+                issues_list.append(Issue.model_validate(viol))
             except Exception as e:
                 logger.error(f"Error parsing Axe violation into Issue schema: {e}. Violation: {viol}")
                 logger.debug(traceback.format_exc())
 
-        # --- Run custom rules ---
-        logger.info("Running custom accessibility rules.")
-        # Your custom rules still operate on the HTML content, which is good.
-        custom_rule_checks = [
-            check_alt_text(page_html_content),
-            check_heading_structure(page_html_content),
-            check_form_labels(page_html_content),
-            check_color_contrast(page_html_content),
-            check_empty_interactive_elements(page_html_content),
-            check_document_language(page_html_content),
-            check_descriptive_link_text(page_html_content),
-            check_media_captions(page_html_content),
-        ]
-
+        # --- Add custom rule issues (after the Axe issues, as before) ---
         for rule_issues in custom_rule_checks:
             if rule_issues:
                 issues_list.extend(rule_issues)
@@ -122,31 +155,49 @@ async def run_full_analysis(url: HttpUrl) -> Tuple[List[Issue], str, str]:
 
         logger.info(f"Total issues after custom rules: {len(issues_list)}")
 
-        # --- Fetch AI suggestions concurrently ---
-        ai_suggestion_tasks = []
-        for issue in issues_list:
+        # --- Fetch AI suggestions in batches ---
+        # Only issues without a known fix go to Gemini: custom rules already attach their own
+        # suggestions, and common Axe rules have a canonical fix in RULE_FIXES.
+        # Issues sharing the same (description, help) pair (e.g. two rules with identical help
+        # text) are coalesced into one request whose suggestion is reused for all of them.
+        ai_issue_indices: List[List[int]] = [] # Issue positions answered by each request
+        ai_suggestion_requests = []
+        request_by_dedupe_key: Dict[Tuple[str, str], int] = {}
+        for i, issue in enumerate(issues_list):
+            if issue.ai_suggestions is not None:
+                continue
+            static_fix = RULE_FIXES.get(issue.id)
+            if static_fix is not None:
+                issue.ai_suggestions = AiSuggestion(**static_fix)
+                continue
+            dedupe_key = (issue.description, issue.help)
+            request_index = request_by_dedupe_key.get(dedupe_key)
+            if request_index is not None:
+                ai_issue_indices[request_index].append(i)
+                continue
             problematic_html = issue.nodes[0].html if issue.nodes and issue.nodes[0].html else ""
-            ai_suggestion_tasks.append(get_ai_suggestions(issue.description, issue.help, problematic_html))
-
-        if ai_suggestion_tasks:
-            logger.info(f"Fetching AI suggestions for {len(ai_suggestion_tasks)} issues.")
-            ai_suggestions_results = await asyncio.gather(*ai_suggestion_tasks, return_exceptions=True)
-
-            for i, suggestion_data in enumerate(ai_suggestions_results):
-                if isinstance(suggestion_data, Exception):
-                    logger.error(f"AI Suggestion Error for issue {i}: {suggestion_data}")
+            request_by_dedupe_key[dedupe_key] = len(ai_suggestion_requests)
+            ai_issue_indices.append([i])
+            ai_suggestion_requests.append({"description": issue.description, "help": issue.help, "html": problematic_html})
+
+        if ai_suggestion_requests:
+            logger.info(f"Fetching {len(ai_suggestion_requests)} AI suggestions for {sum(map(len, ai_issue_indices))} of {len(issues_list)} issues.")
+            # Several issues per Gemini request instead of one request each
+            ai_suggestions_results = await get_ai_suggestions_batch(ai_suggestion_requests)
+
+            # The batch helper always returns one dict per request (placeholders on failure)
+            for issue_indices, suggestion_data in zip(ai_issue_indices, ai_suggestions_results):
+                try:
+                    suggestion = AiSuggestion(**suggestion_data)
+                except Exception as e:
+                    logger.error(f"Error parsing AI suggestion data for issues {issue_indices}: {e}. Data: {suggestion_data}")
                     logger.debug(traceback.format_exc())
-                    issues_list[i].ai_suggestions = None
-                else:
-                    try:
-                        issues_list[i].ai_suggestions = AiSuggestion(**suggestion_data)
-                    except Exception as e:
-                        logger.error(f"Error parsing AI suggestion data for issue {i}: {e}. Data: {suggestion_data}")
-                        logger.debug(traceback.format_exc())
-                        issues_list[i].ai_suggestions = None
+                    suggestion = None
+                for i in issue_indices:
+                    issues_list[i].ai_suggestions = suggestion
             logger.info("AI suggestion fetching completed.")
         else:
-            logger.info("No issues found, skipping AI suggestion fetching.")
+            logger.info("No issues need AI suggestions, skipping AI suggestion fetching.")
 
         return issues_list, page_html_content, page_title
 
@@ -158,4 +209,46 @@ async def run_full_analysis(url: HttpUrl) -> Tuple[List[Issue], str, str]:
     finally:
         if context: # Check if context was successfully created
             logger.info(f"Closing Playwright browser context for URL: {url}")
-            await close_browser_context(context)
\ No newline at end of file
+            await close_browser_context(context, page)
+
+async def run_full_analysis_cached(url: HttpUrl) -> Tuple[List[Issue], str, str]:
+    """
+    run_full_analysis behind the process-wide analysis cache (see analysis_cache.py).
+    A HEAD request for the page's ETag / Last-Modified runs concurrently with the analysis, so
+    pages that cannot be cached (most dynamic pages send neither header) wait on nothing extra.
+    If an earlier analysis of the URL was stored under the same validators, it is returned and
+    the running analysis is cancelled; otherwise the new result is cached once both are known.
+    A cache hit returns "" as the page HTML (see analysis_cache.py).
+    """
+    validators_task = asyncio.create_task(fetch_validators(url))
+    analysis_task = asyncio.create_task(run_full_analysis(url))
+    try:
+        done, _ = await asyncio.wait({validators_task, analysis_task}, return_when=asyncio.FIRST_COMPLETED)
+        if validators_task in done:
+            validators = validators_task.result()
+            if validators is not None:
+                cached_output = get_cached_analysis(url, validators)
+                if cached_output is not None:
+                    logger.info(f"Analysis cache hit for URL: {url}; page unchanged since the last scan.")
+                    return cached_output
+
+        analysis_output = await analysis_task
+    except BaseException:
+        validators_task.cancel()
+        raise
+    finally:
+        if not analysis_task.done():
+            # Cache hit (or this request was cancelled): stop the scan and let it close its context
+            analysis_task.cancel()
+            await asyncio.gather(analysis_task, return_exceptions=True)
+
+    def store(task: "asyncio.Task[Optional[Validators]]") -> None:
+        if not task.cancelled() and task.result() is not None:
+            cache_analysis(url, task.result(), analysis_output)
+
+    # The HEAD normally finishes long before the scan; if not, cache when it does instead of waiting
+    if validators_task.done():
+        store(validators_task)
+    else:
+        validators_task.add_done_callback(store)
+    return analysis_output
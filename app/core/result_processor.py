@@ -2,6 +2,7 @@
 
 import logging
 import datetime
+from collections import Counter
 from typing import List
 from pydantic import HttpUrl
 
@@ -10,42 +11,46 @@ from ..schemas import AnalysisResult, Issue, AnalysisSummary
 
 logger = logging.getLogger("accessibility_analyzer_backend.core.result_processor")
 
+# Issue severity -> summary bucket. Axe-core reports 'serious' for high-impact issues, counted as
+# moderate here, and some sources report 'low', counted as minor. Unknown severities are ignored.
+SEVERITY_BUCKETS = {
+    "critical": "critical",
+    "serious": "moderate",
+    "moderate": "moderate",
+    "minor": "minor",
+    "low": "minor",
+}
+
+CRITICAL_WEIGHT = 5
+MODERATE_WEIGHT = 2
+MINOR_WEIGHT = 1
+
 def calculate_accessibility_score(issues: List[Issue]) -> AnalysisSummary:
     """
     Calculates the accessibility score and categorizes issues based on their severity.
     """
-    # Initialize AnalysisSummary with the new field names
-    summary = AnalysisSummary(total_issues=len(issues), criticalIssues=0, moderateIssues=0, minorIssues=0, score=100)
-
-    critical_deduction = 0
-    moderate_deduction = 0
-    minor_deduction = 0
-
-    CRITICAL_WEIGHT = 5
-    MODERATE_WEIGHT = 2
-    MINOR_WEIGHT = 1
+    # One pass counts each severity; everything else works on the handful of distinct values
+    severity_counts = Counter(issue.severity for issue in issues)
+    bucket_counts = Counter()
+    for severity, count in severity_counts.items():
+        bucket = SEVERITY_BUCKETS.get(severity)
+        if bucket is not None:
+            bucket_counts[bucket] += count
 
-    for issue in issues:
-        # Use .get to safely access severity, or default to "minor" if not present
-        severity = issue.severity if hasattr(issue, 'severity') else "minor"
-        
-        if severity == "critical":
-            summary.criticalIssues += 1 # Updated to criticalIssues
-            critical_deduction += CRITICAL_WEIGHT
-        elif severity in ["serious", "moderate"]: # Axe-core often uses 'serious' for higher impact
-            summary.moderateIssues += 1 # Updated to moderateIssues
-            moderate_deduction += MODERATE_WEIGHT
-        elif severity == "minor":
-            summary.minorIssues += 1 # Updated to minorIssues
-            minor_deduction += MINOR_WEIGHT
-        # Add 'impact' values that might map to 'minor' if axe-core specific
-        elif severity == "low": # Axe-core also has 'low' impact
-            summary.minorIssues += 1 # Updated to minorIssues
-            minor_deduction += MINOR_WEIGHT
+    critical_issues = bucket_counts["critical"]
+    moderate_issues = bucket_counts["moderate"]
+    minor_issues = bucket_counts["minor"]
 
-
-    calculated_score = 100 - (critical_deduction + moderate_deduction + minor_deduction)
-    summary.score = max(0, calculated_score) # Ensure score doesn't go below 0
+    calculated_score = 100 - (
+        critical_issues * CRITICAL_WEIGHT + moderate_issues * MODERATE_WEIGHT + minor_issues * MINOR_WEIGHT
+    )
+    summary = AnalysisSummary(
+        total_issues=len(issues),
+        criticalIssues=critical_issues,
+        moderateIssues=moderate_issues,
+        minorIssues=minor_issues,
+        score=max(0, calculated_score) # Ensure score doesn't go below 0
+    )
     
     logger.info(f"Score Calculation: Total Issues={summary.total_issues}, Critical={summary.criticalIssues}, " # Updated logger to criticalIssues
                 f"Moderate={summary.moderateIssues}, Minor={summary.minorIssues}, Final Score={summary.score}") # Updated logger
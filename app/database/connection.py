@@ -13,9 +13,14 @@ logger = logging.getLogger("accessibility_analyzer_backend.database.connection")
 client: Optional[AsyncIOMotorClient] = None
 db_instance = None # To hold the database object
 reports_collection_instance = None # To hold the specific collection for reports
+ai_suggestions_collection_instance = None # Persistent cache of Gemini suggestions
+
+AI_SUGGESTIONS_COLLECTION_NAME = "ai_suggestions"
+# Cached suggestions expire after 30 days (MongoDB's TTL monitor deletes them)
+AI_SUGGESTION_TTL_SECONDS = 30 * 24 * 60 * 60
 
 async def connect_to_mongo():
-    global client, db_instance, reports_collection_instance
+    global client, db_instance, reports_collection_instance, ai_suggestions_collection_instance
 
     MONGO_URI = settings.MONGODB_URI
     MONGO_DB_NAME = settings.MONGODB_DB_NAME
@@ -29,6 +34,7 @@ async def connect_to_mongo():
         client = AsyncIOMotorClient(MONGO_URI)
         db_instance = client[MONGO_DB_NAME]
         reports_collection_instance = db_instance[REPORTS_COLLECTION_NAME] # Corrected collection name
+        ai_suggestions_collection_instance = db_instance[AI_SUGGESTIONS_COLLECTION_NAME]
 
         await client.admin.command('ping')
         logger.info("MongoDB connection established successfully.")
@@ -41,28 +47,37 @@ async def connect_to_mongo():
         except OperationFailure as e:
             logger.warning(f"MongoDB index creation warning for '{REPORTS_COLLECTION_NAME}': {e}. If indexes already exist, this is fine.")
 
+        try:
+            await ai_suggestions_collection_instance.create_index("created_at", expireAfterSeconds=AI_SUGGESTION_TTL_SECONDS)
+            logger.info(f"MongoDB TTL index for '{AI_SUGGESTIONS_COLLECTION_NAME}' collection ensured.")
+        except OperationFailure as e:
+            logger.warning(f"MongoDB index creation warning for '{AI_SUGGESTIONS_COLLECTION_NAME}': {e}. If indexes already exist, this is fine.")
+
     except ConnectionFailure as e:
         logger.critical(f"CRITICAL: Could not connect to MongoDB at {MONGO_URI}. "
                         f"Please ensure MongoDB is running and accessible. Error: {e}")
         client = None
         db_instance = None
         reports_collection_instance = None
+        ai_suggestions_collection_instance = None
         raise
     except Exception as e:
         logger.critical(f"An unexpected and critical error occurred during MongoDB connection setup: {e}")
         client = None
         db_instance = None
         reports_collection_instance = None
+        ai_suggestions_collection_instance = None
         raise
 
 async def close_mongo_connection():
-    global client, db_instance, reports_collection_instance
+    global client, db_instance, reports_collection_instance, ai_suggestions_collection_instance
     if client:
         client.close()
         logger.info("MongoDB connection closed.")
         client = None
         db_instance = None
         reports_collection_instance = None # Clear this too
+        ai_suggestions_collection_instance = None
 
 def get_database():
     """Returns the connected MongoDB database instance."""
@@ -78,4 +93,11 @@ def get_reports_collection():
         error_msg = "MongoDB reports collection is not initialized. Ensure connect_to_mongo() was called successfully."
         logger.error(error_msg)
         raise RuntimeError(error_msg)
-    return reports_collection_instance
\ No newline at end of file
+    return reports_collection_instance
+
+def get_ai_suggestions_collection():
+    """
+    Returns the MongoDB collection that persists AI suggestions, or None when MongoDB is not
+    connected. The suggestion cache is optional, so unlike the reports collection this never raises.
+    """
+    return ai_suggestions_collection_instance
@@ -1,7 +1,8 @@
 # backend/app/database/repository.py
 
 import logging
-from typing import List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
 import datetime
 from bson import ObjectId
 from pymongo.errors import PyMongoError
@@ -113,25 +114,48 @@ class AnalysisRepository:
             raise
 
 
-    async def get_all_user_analysis_results(self, user_id: str) -> List[AnalysisResult]:
+    # Fields the report list does not need: per-issue AI suggestions are the bulk of each
+    # document and are served by the single-report endpoint instead.
+    LIST_PROJECTION = {"issues.ai_suggestions": 0}
+    LIST_BATCH_SIZE = 100
+
+    async def iter_user_analysis_results(
+        self, user_id: str, skip: int = 0, limit: Optional[int] = None
+    ) -> AsyncIterator[AnalysisResult]:
+        """
+        Streams the accessibility analysis reports for a given user ID, newest first.
+        Documents are fetched in batches and validated as they arrive, so database IO
+        overlaps with Pydantic validation. Malformed documents are logged and skipped.
+        """
+        cursor = self.collection.find(
+            {"user_id": user_id}, projection=self.LIST_PROJECTION
+        ).sort("timestamp", -1).batch_size(self.LIST_BATCH_SIZE)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        async for doc in cursor:
+            try:
+                # Use model_validate for Pydantic V2 to correctly parse MongoDB document
+                # This handles _id to PyObjectId conversion automatically
+                yield AnalysisResult.model_validate(doc)
+            except Exception as e:
+                logger.error(f"Report Parsing Error: Could not parse document from DB for user {user_id}. Document ID: {doc.get('_id', 'N/A')}. Error: {e}", exc_info=True)
+                logger.error(f"Malformed Document Content (skipped): {doc}")
+                continue # Skip this malformed document and continue with others
+
+
+    async def get_all_user_analysis_results(
+        self, user_id: str, skip: int = 0, limit: Optional[int] = None
+    ) -> List[AnalysisResult]:
         """
         Fetches all accessibility analysis reports for a given user ID.
         """
-        reports: List[AnalysisResult] = []
         try:
-            cursor = self.collection.find({"user_id": user_id}).sort("timestamp", -1)
-            docs_list = await cursor.to_list(None)
-
-            for doc in docs_list:
-                try:
-                    # Use model_validate for Pydantic V2 to correctly parse MongoDB document
-                    # This handles _id to PyObjectId conversion automatically
-                    reports.append(AnalysisResult.model_validate(doc))
-                except Exception as e:
-                    logger.error(f"Report Parsing Error: Could not parse document from DB for user {user_id}. Document ID: {doc.get('_id', 'N/A')}. Error: {e}", exc_info=True)
-                    logger.error(f"Malformed Document Content (skipped): {doc}")
-                    continue # Skip this malformed document and continue with others
-
+            reports: List[AnalysisResult] = [
+                report async for report in self.iter_user_analysis_results(user_id, skip=skip, limit=limit)
+            ]
             logger.info(f"Report Fetch Success: Found {len(reports)} reports for user: {user_id}")
             return reports
         except PyMongoError as e:
@@ -178,4 +202,14 @@ class AnalysisRepository:
             raise
         except Exception as e:
             logger.error(f"Unexpected error fetching report {report_id} for user {user_id}. Error: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+@lru_cache(maxsize=1)
+def get_analysis_repository() -> AnalysisRepository:
+    """
+    Dependency that provides the shared AnalysisRepository instance, for every router.
+    It is created lazily on first use, i.e. *after* the MongoDB connection is established
+    in the application's startup event, and reused afterwards: the Motor collection it
+    wraps is safe to share across coroutines.
+    """
+    return AnalysisRepository()
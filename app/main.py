@@ -1,6 +1,6 @@
 # backend/app/main.py
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient 
 from typing import List, Optional
@@ -10,11 +10,11 @@ from dotenv import load_dotenv
 import sys
 import base64 
 import json 
+import asyncio
+from contextlib import asynccontextmanager
 import firebase_admin
 from firebase_admin import credentials, auth
 from firebase_admin.exceptions import FirebaseError
-import traceback
-from bson import ObjectId # Still import ObjectId, though app.json_encoders will be removed
 
 # --- CRITICAL: Load environment variables at the very beginning ---
 load_dotenv()
@@ -41,8 +41,14 @@ if os.getenv('FIREBASE_SERVICE_ACCOUNT_BASE64'):
 
 # --- Local imports ---
 from app.config import settings
-from app.database.connection import close_mongo_connection, connect_to_mongo
+from app.database.connection import close_mongo_connection, connect_to_mongo, get_ai_suggestions_collection
+from app.core.analysis_cache import close_analysis_cache_client
+from app.services.ai_helper import close_ai_client, set_suggestion_store
+from app.services.axe_runner import load_axe_script
+from app.services.browser import close_playwright_browser_instances, start_browser
 from app.auth.auth_dependency import get_current_user_firebase # Keep this import, it's used as a dependency
+from app.middleware import ConditionalGetMiddleware
+from app.responses import DefaultORJSONResponse
 
 # Explicitly import logging setup
 try:
@@ -85,37 +91,23 @@ except ImportError as e:
 logger = logging.getLogger("accessibility_analyzer_backend.main") # Specific logger for main.py
 
 
-# --- FastAPI App Definition ---
-app = FastAPI(
-    title="Accessibility Analyzer API",
-    description="API for analyzing web page accessibility and providing fix suggestions.",
-    version="1.0.0",
-    response_model_by_alias=True # Crucial for Pydantic models using alias (like _id to id)
-)
-
-# Configure CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.BACKEND_CORS_ORIGINS, # Directly uses list from settings
-    allow_credentials=True,
-    allow_methods=["*"], # Allows GET, POST, PUT, DELETE, OPTIONS, etc.
-    allow_headers=["*"], # Allows all headers from the client
-)
-
-# --- REMOVED: Custom JSON Encoder for ObjectId is no longer necessary with PyObjectId in Pydantic v2 ---
-# app.json_encoders = {
-#     ObjectId: str
-# }
-
-# --- Startup and Shutdown Events ---
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Accessibility Analyzer API is starting up...")
+# --- Startup and Shutdown ---
 
+def _init_firebase():
+    """
+    Initializes the Firebase Admin SDK from the Base64-encoded service account
+    (or GOOGLE_APPLICATION_CREDENTIALS). Runs in a worker thread during startup.
+    Raises RuntimeError when the SDK cannot be initialized, which fails the app's startup.
+    """
     # --- Firebase Admin SDK Initialization using Base64 ENCODED ENV VARIABLE ---
     firebase_service_account_base64 = settings.FIREBASE_SERVICE_ACCOUNT_BASE64 
 
+    if not firebase_service_account_base64 and not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+        logger.critical("CRITICAL - Neither FIREBASE_SERVICE_ACCOUNT_BASE64 nor GOOGLE_APPLICATION_CREDENTIALS is set. "
+                        "Firebase Admin SDK will not be initialized with service account credentials. "
+                        "Please ensure one of these environment variables is set.")
+        raise RuntimeError("Firebase service account key not configured. Cannot initialize Firebase Admin SDK.")
+
     try:
         if firebase_service_account_base64:
             decoded_string = base64.b64decode(firebase_service_account_base64).decode('utf-8')
@@ -124,38 +116,89 @@ async def startup_event():
             cred = credentials.Certificate(service_account_info)
             firebase_admin.initialize_app(cred)
             logger.info("Firebase Admin SDK initialized successfully using Base64 environment variable.")
-        elif os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+        else:
             # Fallback for environments where GOOGLE_APPLICATION_CREDENTIALS is set
             firebase_admin.initialize_app()
             logger.info("Firebase Admin SDK initialized using GOOGLE_APPLICATION_CREDENTIALS.")
-        else:
-            logger.critical("CRITICAL - FIREBASE_SERVICE_ACCOUNT_BASE64 environment variable not found or empty. "
-                             "Firebase Admin SDK will not be initialized with service account credentials. "
-                             "Please ensure one of these environment variables is set.")
-            raise RuntimeError("Firebase service account key not configured. Cannot initialize Firebase Admin SDK.")
 
     except (ValueError, json.JSONDecodeError) as e:
-        logger.critical(f"CRITICAL - Firebase Service Account Error: Invalid Base64 or JSON format in environment variable: {e}")
-        logger.error(traceback.format_exc())
-        sys.exit(1)
+        logger.critical(f"CRITICAL - Firebase Service Account Error: Invalid Base64 or JSON format in environment variable: {e}", exc_info=True)
+        raise RuntimeError("Invalid Firebase service account in FIREBASE_SERVICE_ACCOUNT_BASE64.") from e
     except FirebaseError as e:
-        logger.critical(f"CRITICAL - Failed to initialize Firebase Admin SDK due to Firebase error: {e}")
-        logger.error(traceback.format_exc())
-        sys.exit(1)
+        logger.critical(f"CRITICAL - Failed to initialize Firebase Admin SDK due to Firebase error: {e}", exc_info=True)
+        raise RuntimeError("Failed to initialize Firebase Admin SDK.") from e
     except Exception as e:
-        logger.critical(f"CRITICAL - An unexpected error occurred during Firebase initialization: {e}")
-        logger.error(traceback.format_exc())
-        sys.exit(1)
-
-    # --- MongoDB Connection ---
-    await connect_to_mongo()
+        logger.critical(f"CRITICAL - An unexpected error occurred during Firebase initialization: {e}", exc_info=True)
+        raise RuntimeError("Failed to initialize Firebase Admin SDK.") from e
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Accessibility Analyzer API is shutting down.")
+async def _close_resources():
+    """Closes everything startup may have opened; safe to call after a partial startup."""
     # --- MongoDB Disconnection ---
     await close_mongo_connection()
+    # --- Shared Gemini HTTP client ---
+    await close_ai_client()
+    # --- Shared HTTP client for analysis cache validators ---
+    await close_analysis_cache_client()
+    # --- Shared Playwright browser ---
+    await close_playwright_browser_instances()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Accessibility Analyzer API is starting up...")
+
+    # Firebase init (CPU/filesystem) and the MongoDB connection (network) are independent,
+    # so run them concurrently; Firebase goes to a thread to keep the event loop free.
+    # The Playwright browsers are launched (and warmed with one throwaway context) and
+    # axe.min.js is read alongside, so the first analysis pays for none of it.
+    startup_tasks = [
+        asyncio.create_task(asyncio.to_thread(_init_firebase)),
+        asyncio.create_task(connect_to_mongo()),
+        asyncio.create_task(start_browser("chromium")),
+        asyncio.create_task(load_axe_script()),
+    ]
+    try:
+        await asyncio.gather(*startup_tasks)
+    except BaseException:
+        # One step failed: stop the others (gather leaves them running), close whatever they
+        # opened, and let the error fail the startup.
+        for task in startup_tasks:
+            task.cancel()
+        await asyncio.gather(*startup_tasks, return_exceptions=True)
+        await _close_resources()
+        raise
+    # Persist AI suggestions in MongoDB so the cache survives restarts
+    set_suggestion_store(get_ai_suggestions_collection())
+
+    yield
+
+    logger.info("Accessibility Analyzer API is shutting down.")
+    await _close_resources()
+
+
+# --- FastAPI App Definition ---
+app = FastAPI(
+    title="Accessibility Analyzer API",
+    description="API for analyzing web page accessibility and providing fix suggestions.",
+    version="1.0.0",
+    response_model_by_alias=True, # Crucial for Pydantic models using alias (like _id to id)
+    default_response_class=DefaultORJSONResponse, # orjson instead of stdlib json for every endpoint
+    lifespan=lifespan
+)
+
+# ETag / Cache-Control for single report fetches (GET /api/reports/{report_id}).
+# Added before CORS so the CORS middleware stays outermost.
+app.add_middleware(ConditionalGetMiddleware)
+
+# Configure CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS, # Directly uses list from settings
+    allow_credentials=True,
+    allow_methods=["*"], # Allows GET, POST, PUT, DELETE, OPTIONS, etc.
+    allow_headers=["*"], # Allows all headers from the client
+)
 
 # --- Include API routers ---
 app.include_router(analyze_router, prefix="/api", tags=["Analysis"])
@@ -169,7 +212,13 @@ if settings_router:
     app.include_router(settings_router, prefix="/api", tags=["Settings"])
 
 
+# The root endpoint doubles as a health check polled by load balancers, so its body is
+# serialized once at import time instead of on every hit.
+_ROOT_BYTES = b'{"message":"Accessibility Analyzer API is running!"}'
+
+
 @app.get("/")
 async def read_root():
-    logger.info("API root endpoint hit.")
-    return {"message": "Accessibility Analyzer API is running!"}
\ No newline at end of file
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("API root endpoint hit.")
+    return Response(content=_ROOT_BYTES, media_type="application/json")
\ No newline at end of file
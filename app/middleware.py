@@ -0,0 +1,97 @@
+# backend/app/middleware.py
+
+import hashlib
+import re
+from typing import List, Optional, Pattern, Tuple
+
+# Single report documents: /api/reports/{24-hex ObjectId} (but not /api/reports/user/{uid}).
+# Matched against the whole path with fullmatch (a `$` anchor would also accept a trailing "\n").
+REPORT_DETAIL_PATH_RE = re.compile(r"/api/reports/[0-9a-fA-F]{24}")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header value against our ETag, per RFC 9110."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """
+    Pure ASGI middleware adding `ETag` and `Cache-Control` headers to GET responses
+    on paths that fully match `path_pattern`, and answering `If-None-Match` hits
+    with an empty 304 so the report body is not sent again.
+    The ETag is a BLAKE2b digest of the response body, computed once per response.
+    Responses are sent with `private, no-cache`: a report can be deleted or re-analyzed
+    at any time, so browsers must revalidate on every use (a cheap 304 when unchanged)
+    instead of serving a possibly deleted report from cache.
+    """
+
+    def __init__(self, app, path_pattern: Pattern[str] = REPORT_DETAIL_PATH_RE):
+        self.app = app
+        self.path_pattern = path_pattern
+        self.cache_control = b"private, no-cache"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.path_pattern.fullmatch(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match: Optional[str] = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        start_message: Optional[dict] = None
+        passthrough = False
+        body_parts: List[bytes] = []
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    # Errors and redirects are forwarded untouched
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers", []))
+            headers.append((b"etag", etag.encode("latin-1")))
+            headers.append((b"cache-control", self.cache_control))
+
+            if _etag_matches(if_none_match, etag):
+                # 304 carries the validators but no body (and so no content headers)
+                not_modified_headers = [
+                    (name, value) for name, value in headers
+                    if name not in (b"content-length", b"content-type")
+                ]
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified_headers})
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,34 @@
+# backend/app/responses.py
+
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+class DefaultORJSONResponse(ORJSONResponse):
+    """
+    App-wide JSON response class backed by orjson.
+    Anything orjson cannot serialize natively (e.g. bson.ObjectId) falls back to str().
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_json_response(content: Any, status_code: int = 200, adapter: Optional[TypeAdapter] = None) -> Response:
+    """
+    Serializes Pydantic data (by alias) straight to JSON bytes with Pydantic's Rust serializer.
+    Returning a Response skips FastAPI's response_model path, which would re-validate the
+    already-validated model and walk it through jsonable_encoder before encoding it.
+    Pass `adapter` for content that is not a single model, e.g. TypeAdapter(List[Model]).
+    """
+    if adapter is not None:
+        body = adapter.dump_json(content, by_alias=True)
+    elif isinstance(content, BaseModel):
+        body = content.model_dump_json(by_alias=True)
+    else:
+        raise TypeError(f"model_json_response needs a Pydantic model or an adapter, got {type(content).__name__}")
+    return Response(content=body, status_code=status_code, media_type="application/json")
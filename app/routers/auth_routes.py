@@ -1,5 +1,6 @@
 # backend/app/routers/auth_routes.py
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from firebase_admin import auth
 from firebase_admin.exceptions import FirebaseError
@@ -32,7 +33,8 @@ async def verify_firebase_token(id_token: str):
     Verifies a Firebase ID Token and returns the decoded token payload.
     """
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        # Blocking call (signature check, occasional certificate download); see auth_dependency.py
+        decoded_token = await asyncio.to_thread(auth.verify_id_token, id_token)
         logger.info(f"Token verified for user: {decoded_token.get('uid')}")
         return {"message": "Token verified successfully", "decoded_token": decoded_token}
     except FirebaseError as e:
@@ -1,16 +1,19 @@
 # backend/app/routers/report_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import TypeAdapter
+from typing import List, Optional
 import logging
+import re
 from bson import ObjectId # Still needed here for the delete route's direct DB call temporarily
 
 # --- CRITICAL FIX: Use the correct schema import path ---
 # Assuming AnalysisResult is your primary report schema (previously ReportDB)
 from ..schemas import AnalysisResult 
+from ..responses import model_json_response
 
 # --- IMPORTANT: Import AnalysisRepository ---
-from ..database.repository import AnalysisRepository
+from ..database.repository import AnalysisRepository, get_analysis_repository
 from app.auth.auth_dependency import get_current_user_firebase # For protected routes
 from app.database.connection import get_database # Keep for temporary delete_report direct DB call
 
@@ -18,40 +21,63 @@ logger = logging.getLogger("accessibility_analyzer_backend.report_routes")
 
 router = APIRouter()
 
+# Serializer for report lists, built once (response_model still documents the endpoint)
+_REPORT_LIST_ADAPTER = TypeAdapter(List[AnalysisResult])
+
+# MongoDB ObjectIds are always 24 hex characters; reject anything else before touching bson or Mongo.
+# Used with fullmatch: a `$` anchor would also accept a trailing "\n", which ObjectId() then rejects.
+_OID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+def _ensure_valid_report_id(report_id: str) -> None:
+    """
+    Raises a 400 for report IDs that cannot possibly be MongoDB ObjectIds.
+    """
+    if not _OID_RE.fullmatch(report_id):
+        logger.warning(f"Invalid report ID format provided: {report_id}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid report ID format: {report_id}"
+        )
+
 # --- REMOVED: convert_object_id helper is no longer needed with PyObjectId in schema ---
 
-# Dependency to get the repository instance
-def get_analysis_repository() -> AnalysisRepository:
+async def require_self(user_uid: str, current_user: dict = Depends(get_current_user_firebase)) -> str:
     """
-    Dependency function to provide an instance of AnalysisRepository.
+    Dependency that ensures the authenticated user is accessing their own data.
+    Raises a 403 before any other work is done for the request; returns the user_uid otherwise.
     """
-    return AnalysisRepository()
+    if current_user["uid"] != user_uid:
+        logger.warning(f"Unauthorized attempt to access reports for user_uid: {user_uid} by current_user: {current_user['uid']}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to view these reports."
+        )
+    return user_uid
 
 # Get all reports for a specific user
 @router.get("/reports/user/{user_uid}", response_model=List[AnalysisResult], summary="Get all reports for a specific user")
 async def get_user_reports(
-    user_uid: str,
-    current_user: dict = Depends(get_current_user_firebase),
-    repository: AnalysisRepository = Depends(get_analysis_repository) # Use repository dependency
+    skip: int = Query(0, ge=0, description="Number of reports to skip (newest first)."),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of reports to return."),
+    user_uid: str = Depends(require_self) # Security check: 403 unless the caller owns these reports
 ):
     """
     Retrieves all accessibility reports associated with a given user UID.
     The authenticated user's UID must match the requested user_uid.
+    Per-issue AI suggestions are omitted here; fetch a single report for those.
+    Use `skip`/`limit` to page through large report histories.
     """
-    # Security check: Ensure the authenticated user is accessing their own reports
-    if current_user["uid"] != user_uid:
-        logger.warning(f"Unauthorized attempt to access reports for user_uid: {user_uid} by current_user: {current_user['uid']}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not authorized to view these reports."
-        )
+    # Resolved only after the ownership check has passed
+    repository = get_analysis_repository()
 
     try:
         # Use the repository method to fetch reports
-        reports = await repository.get_all_user_analysis_results(user_uid)
+        reports = [
+            report async for report in repository.iter_user_analysis_results(user_uid, skip=skip, limit=limit)
+        ]
         logger.info(f"Fetched {len(reports)} reports for user: {user_uid}")
-        # Pydantic (AnalysisResult model) will automatically handle the ObjectId to string conversion for the response
-        return reports 
+        # Pydantic (AnalysisResult model) handles the ObjectId to string conversion while serializing
+        return model_json_response(reports, adapter=_REPORT_LIST_ADAPTER)
     except Exception as e:
         logger.error(f"Error fetching reports for user {user_uid}: {e}", exc_info=True)
         raise HTTPException(
@@ -70,6 +96,8 @@ async def get_single_report(
     Retrieves a single accessibility report by its unique ID.
     The authenticated user must be the owner of the report.
     """
+    _ensure_valid_report_id(report_id)
+
     try:
         # Use the repository method to fetch the report.
         # The repository method already includes the user_id in its query for security.
@@ -81,8 +109,10 @@ async def get_single_report(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found or you are not authorized to view it.")
         
         logger.info(f"Fetched report {report_id} for user: {current_user['uid']}")
-        # Pydantic (AnalysisResult model) will automatically handle the ObjectId to string conversion for the response
-        return report 
+        # Pydantic (AnalysisResult model) handles the ObjectId to string conversion while serializing
+        return model_json_response(report)
+    except HTTPException:
+        raise
     except ValueError as ve: # Catch specific error from repository if ID format is invalid
         logger.warning(f"Invalid report ID format provided: {report_id}. Error: {ve}")
         raise HTTPException(
@@ -107,6 +137,8 @@ async def delete_report(
     Deletes an accessibility report by its unique ID.
     The authenticated user must be the owner of the report.
     """
+    _ensure_valid_report_id(report_id)
+
     try:
         # NOTE: A `delete_report` method should ideally be added to `AnalysisRepository`
         # for full consistency and separation of concerns.
@@ -114,32 +146,33 @@ async def delete_report(
         
         db = get_database()
         reports_collection = db["reports"]
+        obj_id = ObjectId(report_id)
+
+        # Ownership is part of the filter, so a single round-trip both verifies and deletes.
+        deleted = await reports_collection.find_one_and_delete(
+            {"_id": obj_id, "user_id": current_user["uid"]},
+            projection={"_id": 1}
+        )
+
+        if deleted is None:
+            # Only on the miss path: look the report up to tell 404 apart from 403 for the client.
+            existing = await reports_collection.find_one({"_id": obj_id}, {"user_id": 1})
+            if not existing:
+                logger.warning(f"Report not found with ID: {report_id}")
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
 
-        # 1. Find the report to verify ownership
-        report_to_delete = await reports_collection.find_one({"_id": ObjectId(report_id)})
-        
-        if not report_to_delete:
-            logger.warning(f"Report not found with ID: {report_id}")
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
-        
-        if report_to_delete.get("user_id") != current_user["uid"]:
             logger.warning(f"Unauthorized attempt to delete report {report_id} by user: {current_user['uid']}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not authorized to delete this report."
             )
         
-        # 2. Delete the report
-        delete_result = await reports_collection.delete_one({"_id": ObjectId(report_id)})
-        
-        if delete_result.deleted_count == 0:
-            # This might happen in a very rare race condition or if the ID wasn't found despite the find_one
-            logger.warning(f"Report {report_id} not found for deletion after ownership check (race condition?).")
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found for deletion.")
-        
         logger.info(f"Report {report_id} deleted by user: {current_user['uid']}")
         return {} # FastAPI automatically handles 204 No Content for empty dict/None
 
+    except HTTPException:
+        # Re-raise the 404/403 above instead of letting the generic handler turn them into a 500
+        raise
     except ValueError as ve: # Catch specific error if report_id is not a valid ObjectId string
         logger.warning(f"Invalid report ID format provided for deletion: {report_id}. Error: {ve}")
         raise HTTPException(
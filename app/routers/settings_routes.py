@@ -39,7 +39,7 @@ async def get_user_settings(current_user: dict = Depends(get_current_user_fireba
     If no settings are found, default settings are returned.
     """
     user_id = current_user["uid"]
-    logger.info(f"Fetching settings for user: {user_id}")
+    logger.info("Fetching settings for user: %s", user_id)
 
     # Simulate fetching from a database
     settings = mock_user_settings_db.get(user_id)
@@ -60,7 +60,9 @@ async def update_user_settings(
     Updates the settings for the authenticated user.
     """
     user_id = current_user["uid"]
-    logger.info(f"Updating settings for user: {user_id} with data: {settings_data.dict()}")
+    # Only pay for the model dump when INFO logging is actually enabled
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Updating settings for user: %s with data: %s", user_id, settings_data.model_dump())
 
     # Simulate saving to a database
     mock_user_settings_db[user_id] = settings_data
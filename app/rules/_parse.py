@@ -0,0 +1,71 @@
+# backend/app/rules/_parse.py
+
+import threading
+from html import escape
+from typing import Optional
+import lxml.html
+from lxml import etree
+
+# Shared HTML parsing helpers for the custom rules.
+# lxml builds the tree in C (libxml2), so rules no longer pay for BeautifulSoup's
+# per-node Python objects when walking large pages.
+# The page is parsed once per analysis and the tree is shared by every rule, and most lookups
+# are precompiled XPath, so parsing is a single C pass; a second native parser (e.g.
+# selectolax) would only add a dependency with a different node API for no measurable gain.
+
+# Parser instances are reused across calls instead of being rebuilt per parse. An lxml parser
+# must not be used by two threads at once, so each thread gets its own.
+_thread_local = threading.local()
+
+
+def _get_parser() -> lxml.html.HTMLParser:
+    """Returns this thread's cached HTML parser, creating it on first use."""
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        # No rule inspects comments or processing instructions, so the parser drops them
+        # instead of materializing them as tree nodes (lxml's analogue of bs4's SoupStrainer).
+        parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+        _thread_local.parser = parser
+    return parser
+
+
+def parse(html_content: str) -> Optional[etree._Element]:
+    """
+    Parses an HTML document and returns its root <html> element.
+    Like browsers, lxml supplies the <html>/<body> wrappers when the markup omits them.
+    Returns None when the document is empty.
+    """
+    if not html_content or not html_content.strip():
+        return None
+    parser = _get_parser()
+    try:
+        try:
+            return lxml.html.document_fromstring(html_content, parser=parser)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration; parse the UTF-8 bytes instead.
+            return lxml.html.document_fromstring(html_content.encode("utf-8"), parser=parser)
+    except etree.ParserError:
+        # "Document is empty" (e.g. only comments or whitespace)
+        return None
+
+
+# Upper bound for element HTML stored on an issue; keeps reports small when a flagged
+# element wraps a large subtree.
+MAX_NODE_HTML = 512
+
+
+def node_html(element: etree._Element, max_length: int = MAX_NODE_HTML) -> str:
+    """
+    Serializes an element (and its children, but not its tail text) back to HTML,
+    truncated to `max_length` characters.
+    """
+    markup = etree.tostring(element, encoding="unicode", method="html", with_tail=False)
+    if len(markup) > max_length:
+        return markup[:max_length] + "..."
+    return markup
+
+
+def opening_tag_html(element: etree._Element) -> str:
+    """Builds only the element's opening tag (e.g. `<html class="x">`), without serializing its children."""
+    attrs = "".join(f' {name}="{escape(value, quote=True)}"' for name, value in element.attrib.items())
+    return f"<{element.tag}{attrs}>"
@@ -1,30 +1,36 @@
 # backend/app/rules/alt_text.py
 
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from lxml import etree
 from ..schemas import Issue, IssueNode, AiSuggestion
+from ._parse import parse, node_html
 
-def check_alt_text(html_content: str) -> List[Issue]:
+def check_alt_text(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
     """
     Checks for images with missing or empty alt text.
 
     Args:
         html_content (str): The full HTML content of the page to analyze.
+        tree (Optional[etree._Element]): A root already built with `_parse.parse`, so the page is parsed only once.
 
     Returns:
         List[Issue]: A list of Issue objects for images missing alt text.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    root = tree if tree is not None else parse(html_content)
     issues: List[Issue] = []
+    if root is None:
+        return issues
 
     # Find all <img> tags in the HTML content
-    images = soup.find_all('img')
+    images = root.iter('img')
 
     for img in images:
         alt_text = img.get('alt')
         
         # Check if the 'alt' attribute is missing OR if it's present but empty/whitespace only
         if alt_text is None or not alt_text.strip():
+            # Serialize the image once; the node and the detailed fix share the markup
+            issue_html = node_html(img)
             # If an issue is found, create an Issue object
             issue = Issue(
                 id="custom-image-alt-missing",
@@ -33,13 +39,13 @@ def check_alt_text(html_content: str) -> List[Issue]:
                 severity="critical", # Images without alt text can be critical for screen reader users
                 nodes=[
                     IssueNode(
-                        html=str(img), # Store the full HTML tag of the problematic image
-                        target=[img.name] # The tag name, e.g., 'img'
+                        html=issue_html, # Store the full HTML tag of the problematic image
+                        target=[img.tag] # The tag name, e.g., 'img'
                     )
                 ],
                 ai_suggestions=AiSuggestion(
                     short_fix="Add descriptive alt text to the image.",
-                    detailed_fix=f"For the image: `{str(img)}`, add a descriptive `alt` attribute that conveys the image's purpose or content. For example, if it's a company logo, use `<img src='...' alt='Company Logo'>`. If the image serves no functional purpose and is purely decorative, set `alt=''` to hide it from screen readers."
+                    detailed_fix=f"For the image: `{issue_html}`, add a descriptive `alt` attribute that conveys the image's purpose or content. For example, if it's a company logo, use `<img src='...' alt='Company Logo'>`. If the image serves no functional purpose and is purely decorative, set `alt=''` to hide it from screen readers."
                 )
             )
             issues.append(issue)
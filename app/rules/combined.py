@@ -0,0 +1,61 @@
+# backend/app/rules/combined.py
+
+from typing import Dict, List, Optional, Tuple
+from lxml import etree
+from ..schemas import Issue
+from ._parse import parse
+from .contrast import CONTRAST_TAGS, ColorPair, color_pair_for, contrast_issues
+from .descriptive_link_text import link_text_issue
+from .document_language import check_document_language
+from .empty_interactive import empty_interactive_issue
+from .headings import HEADING_TAGS, heading_issues
+
+_CONTRAST_TAG_SET = frozenset(CONTRAST_TAGS)
+_HEADING_LEVELS = {tag: int(tag[1]) for tag in HEADING_TAGS}
+
+def check_all(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
+    """
+    Runs the heading, color contrast, empty interactive element, document language and
+    descriptive link text rules in a single walk over the DOM instead of one traversal per rule.
+    Each element is dispatched to every rule that applies to its tag; per-rule results are
+    kept in separate buckets so the returned list has the same order as calling
+    check_heading_structure, check_color_contrast, check_empty_interactive_elements,
+    check_document_language and check_descriptive_link_text one after another.
+    `tree` may be a root already built with `_parse.parse` so the page is parsed only once.
+    """
+    root = tree if tree is not None else parse(html_content)
+
+    first_by_level: Dict[int, etree._Element] = {}
+    contrast_candidates: List[Tuple[etree._Element, ColorPair]] = []
+    empty_interactive: List[Issue] = []
+    link_text: List[Issue] = []
+
+    if root is not None:
+        for element in root.iter(tag=etree.Element):
+            tag = element.tag
+
+            level = _HEADING_LEVELS.get(tag)
+            if level is not None and level not in first_by_level:
+                first_by_level[level] = element
+
+            if tag in _CONTRAST_TAG_SET:
+                pair = color_pair_for(element)
+                if pair is not None:
+                    contrast_candidates.append((element, pair))
+
+            if tag == 'a' or tag == 'button':
+                issue = empty_interactive_issue(element)
+                if issue is not None:
+                    empty_interactive.append(issue)
+                if tag == 'a' and element.get('href') is not None:
+                    issue = link_text_issue(element)
+                    if issue is not None:
+                        link_text.append(issue)
+
+    issues: List[Issue] = heading_issues(first_by_level)
+    issues.extend(contrast_issues(contrast_candidates))
+    issues.extend(empty_interactive)
+    # The language check only looks at the root element, so it needs no part of the walk
+    issues.extend(check_document_language(html_content, tree=root))
+    issues.extend(link_text)
+    return issues
@@ -1,44 +1,76 @@
 # backend/app/rules/contrast.py
 
-from bs4 import BeautifulSoup
 import re
-from typing import List, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
+from lxml import etree
 from ..schemas import Issue, IssueNode, AiSuggestion
+from ._parse import parse, node_html
+
+# Text-bearing tags whose inline colours are checked
+CONTRAST_TAGS = ('p', 'span', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a', 'li', 'td', 'th', 'label')
+# Compiled once; only elements whose inline style mentions a colour can match this rule,
+# so filter on that in C too and unstyled tags never reach Python.
+_STYLED_CANDIDATES = etree.XPath(
+    "//*[" + " or ".join(f"self::{tag}" for tag in CONTRAST_TAGS) + "][contains(@style, 'color')]"
+)
+# Inline `color` (anchored to a declaration start so `background-color` cannot match) and `background-color` hex values
+_COLOR_RE = re.compile(r'(?:^|;)\s*color\s*:\s*(#[0-9a-fA-F]{3}(?:[0-9a-fA-F]{3})?)')
+_BG_RE = re.compile(r'background-color\s*:\s*(#[0-9a-fA-F]{3}(?:[0-9a-fA-F]{3})?)')
+
+# ASCII byte -> hex digit value (-1 for anything that is not a hex digit), built once at import
+_NIBBLE = [-1] * 256
+for _value, _digit in enumerate(b'0123456789abcdef'):
+    _NIBBLE[_digit] = _value
+for _value, _digit in enumerate(b'ABCDEF', start=10):
+    _NIBBLE[_digit] = _value
+del _value, _digit
 
 # --- Helper Functions for Color Conversion and Contrast Calculation ---
 # These functions are simplified. A robust solution would use a dedicated library
 # like 'colour' or 'colormath' for accurate color space conversions and contrast.
 
+@lru_cache(maxsize=1024)
 def hex_to_rgb(hex_color: str) -> Optional[Tuple[int, int, int]]:
     """Converts a hex color string (e.g., #RRGGBB or #RGB) to an RGB tuple."""
     hex_color = hex_color.lstrip('#')
     if len(hex_color) == 3:
-        hex_color = ''.join([c*2 for c in hex_color]) # Expand #RGB to #RRGGBB
-    
-    if len(hex_color) == 6:
-        try:
-            return int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
-        except ValueError:
-            return None
-    return None
-
+        hex_color = hex_color[0] * 2 + hex_color[1] * 2 + hex_color[2] * 2 # Expand #RGB to #RRGGBB
+
+    if len(hex_color) != 6 or not hex_color.isascii():
+        return None
+    b = hex_color.encode('ascii')
+    r = (_NIBBLE[b[0]] << 4) | _NIBBLE[b[1]]
+    g = (_NIBBLE[b[2]] << 4) | _NIBBLE[b[3]]
+    bl = (_NIBBLE[b[4]] << 4) | _NIBBLE[b[5]]
+    # An invalid digit makes its nibble -1, which turns the whole channel negative
+    if r < 0 or g < 0 or bl < 0:
+        return None
+    return r, g, bl
+
+@lru_cache(maxsize=1024)
 def get_luminance(rgb: Tuple[int, int, int]) -> float:
     """Calculates the relative luminance of an RGB color, per WCAG."""
-    R, G, B = [x / 255.0 for x in rgb]
-    Rs, Gs, Bs = [], [], []
+    r, g, b = rgb
+    # L = 0.2126 * R + 0.7152 * G + 0.0722 * B, on linearized sRGB channels
+    return 0.2126 * _linearize(r / 255.0) + 0.7152 * _linearize(g / 255.0) + 0.0722 * _linearize(b / 255.0)
 
-    for color in [R, G, B]:
-        if color <= 0.03928:
-            c_srgb = color / 12.92
-        else:
-            c_srgb = ((color + 0.055) / 1.055) ** 2.4
-        Rs.append(c_srgb)
-    
-    # L = 0.2126 * R + 0.7152 * G + 0.0722 * B
-    return 0.2126 * Rs[0] + 0.7152 * Rs[1] + 0.0722 * Rs[2]
+def _linearize(channel: float) -> float:
+    """Converts a gamma-encoded sRGB channel (0..1) to linear light."""
+    if channel <= 0.03928:
+        return channel / 12.92
+    return ((channel + 0.055) / 1.055) ** 2.4
 
 def get_contrast_ratio(rgb1: Tuple[int, int, int], rgb2: Tuple[int, int, int]) -> float:
     """Calculates the contrast ratio between two RGB colors."""
+    # The ratio is symmetric, so (a, b) and (b, a) share one cache slot
+    if rgb2 < rgb1:
+        rgb1, rgb2 = rgb2, rgb1
+    return _contrast_cached(rgb1, rgb2)
+
+@lru_cache(maxsize=1024)
+def _contrast_cached(rgb1: Tuple[int, int, int], rgb2: Tuple[int, int, int]) -> float:
+    """Cached contrast ratio for an ordered pair of RGB colors."""
     L1 = get_luminance(rgb1)
     L2 = get_luminance(rgb2)
     
@@ -50,69 +82,83 @@ def get_contrast_ratio(rgb1: Tuple[int, int, int], rgb2: Tuple[int, int, int]) -
 
 # --- Main Rule Function ---
 
-def check_color_contrast(html_content: str) -> List[Issue]:
+# WCAG 2.1 AA requirements:
+# Normal text: 4.5:1
+# Large text (18pt/24px or 14pt/18.66px bold): 3:1
+# Since we can't reliably detect "large text" from static HTML, we use 4.5:1 for all.
+REQUIRED_RATIO = 4.5
+
+ColorPair = Tuple[Tuple[int, int, int], Tuple[int, int, int]]
+
+# If the channel sums (r+g+b) of two colours differ by more than this, their contrast ratio is at
+# least 4.5:1 whatever the individual channels are. Found by exhaustive search over all 24-bit
+# colours: a difference of 627 guarantees >= 4.53:1, while 626 can still be as low as 4.47:1.
+_SAFE_SUM_DIFFERENCE = 626
+
+def color_pair_for(element: etree._Element) -> Optional[ColorPair]:
     """
-    Performs a basic check for color contrast based on inline styles and
-    <style> tags. Note: This rule is limited as it does not parse external CSS
-    or computed styles, which are crucial for accurate contrast checking.
+    Returns the (text_rgb, bg_rgb) pair set by an element's inline style, or None when the
+    element does not declare both colours as hex values or has no text to contrast.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
-    issues: List[Issue] = []
+    # Simplified approach: Check inline styles first
+    style = element.get('style')
+    if not style or 'color' not in style:
+        return None
 
-    # Find elements with potential text and background colors
-    elements = soup.find_all(lambda tag: tag.name in ['p', 'span', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a', 'li', 'td', 'th', 'label'] and tag.get_text(strip=True))
+    text_match = _COLOR_RE.search(style)
+    bg_match = _BG_RE.search(style)
 
-    for element in elements:
-        # Skip if the element's text content is empty or contains only whitespace
-        if not element.get_text(strip=True):
-            continue
-        
-        # Simplified approach: Check inline styles first
-        style = element.get('style')
-        text_color_hex = None
-        bg_color_hex = None
-
-        if style:
-            text_match = re.search(r'color:\s*#([0-9a-fA-F]{3}){1,2}', style)
-            bg_match = re.search(r'background-color:\s*#([0-9a-fA-F]{3}){1,2}', style)
-            
-            if text_match:
-                text_color_hex = text_match.group(0).split(':')[1].strip()
-            if bg_match:
-                bg_color_hex = bg_match.group(0).split(':')[1].strip()
-        
-        # For a more comprehensive check, you'd also need to:
-        # 1. Parse <style> tags and apply rules based on selectors (complex).
-        # 2. Consider default browser styles.
-        # 3. Handle rgba, rgb, named colors, HSL, etc.
-        # 4. Get *computed* styles which reflects all inherited and applied CSS.
-
-        # For this simplified version, if we can't find both colors, we skip.
-        if not (text_color_hex and bg_color_hex):
-            continue
-        
-        text_rgb = hex_to_rgb(text_color_hex)
-        bg_rgb = hex_to_rgb(bg_color_hex)
+    # For a more comprehensive check, you'd also need to:
+    # 1. Parse <style> tags and apply rules based on selectors (complex).
+    # 2. Consider default browser styles.
+    # 3. Handle rgba, rgb, named colors, HSL, etc.
+    # 4. Get *computed* styles which reflects all inherited and applied CSS.
 
-        if not (text_rgb and bg_rgb):
-            continue # Could not parse colors
+    # For this simplified version, if we can't find both colors, we skip.
+    if not (text_match and bg_match):
+        return None
 
-        contrast = get_contrast_ratio(text_rgb, bg_rgb)
-        
-        # WCAG 2.1 AA requirements:
-        # Normal text: 4.5:1
-        # Large text (18pt/24px or 14pt/18.66px bold): 3:1
-        # Since we can't reliably detect "large text" from static HTML, we use 4.5:1 for all.
-        required_ratio = 4.5
-
-        if contrast < required_ratio:
-            issue_html = str(element)
+    text_rgb = hex_to_rgb(text_match.group(1))
+    bg_rgb = hex_to_rgb(bg_match.group(1))
+
+    if not (text_rgb and bg_rgb):
+        return None # Could not parse colors
+
+    # Skip if the element's text content is empty or contains only whitespace.
+    # Checked last: it walks the element's whole subtree, unlike the attribute checks above.
+    if not element.text_content().strip():
+        return None
+
+    return text_rgb, bg_rgb
+
+def contrast_issues(candidates: List[Tuple[etree._Element, ColorPair]]) -> List[Issue]:
+    """Builds low-contrast issues for (element, color pair) candidates, in the given order."""
+    issues: List[Issue] = []
+    required_ratio = REQUIRED_RATIO
+
+    # Pages reuse a handful of colour pairs, so compute each distinct pair's ratio once.
+    # None marks pairs known to pass without running the WCAG formula.
+    ratios: Dict[ColorPair, Optional[float]] = {}
+    for pair in {pair for _, pair in candidates}:
+        text_rgb, bg_rgb = pair
+        if text_rgb == bg_rgb:
+            ratios[pair] = 1.0 # Identical colours: always fails
+        elif abs(sum(text_rgb) - sum(bg_rgb)) > _SAFE_SUM_DIFFERENCE:
+            ratios[pair] = None # e.g. black on white: always passes
+        else:
+            ratios[pair] = get_contrast_ratio(text_rgb, bg_rgb)
+
+    for element, pair in candidates:
+        contrast = ratios[pair]
+
+        if contrast is not None and contrast < required_ratio:
+            issue_html = node_html(element)
             issues.append(Issue(
                 id="custom-color-contrast-low",
                 description=f"Low color contrast: The contrast ratio is {contrast:.2f}:1, but requires {required_ratio}:1.",
                 help=f"Text and background colors must have a sufficient contrast ratio ({required_ratio}:1 for normal text) to be readable for users with visual impairments and in varying lighting conditions. Without sufficient contrast, text can be difficult or impossible for some users to read.",
                 severity="critical", # Contrast issues are often critical
-                nodes=[IssueNode(html=issue_html, target=[element.name])],
+                nodes=[IssueNode(html=issue_html, target=[element.tag])],
                 ai_suggestions=AiSuggestion(
                     short_fix="Increase the contrast between text and background colors.",
                     detailed_fix=f"For the element: `{issue_html}`, modify the `color` and/or `background-color` to achieve a contrast ratio of at least {required_ratio}:1. Use a color contrast checker tool (e.g., WebAIM Contrast Checker) to find suitable color combinations. Consider making the text darker or the background lighter (or vice-versa) to improve readability. Ensure this applies to all states (hover, focus, active) if dynamic styles are used."
@@ -121,6 +167,24 @@ def check_color_contrast(html_content: str) -> List[Issue]:
     
     return issues
 
+def check_color_contrast(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
+    """
+    Performs a basic check for color contrast based on inline styles and
+    <style> tags. Note: This rule is limited as it does not parse external CSS
+    or computed styles, which are crucial for accurate contrast checking.
+    `tree` may be a root already built with `_parse.parse` so the page is parsed only once.
+    """
+    root = tree if tree is not None else parse(html_content)
+    if root is None:
+        return []
+
+    candidates = []
+    for element in _STYLED_CANDIDATES(root):
+        pair = color_pair_for(element)
+        if pair is not None:
+            candidates.append((element, pair))
+    return contrast_issues(candidates)
+
 if __name__ == "__main__":
     print("--- Testing backend/app/rules/contrast.py locally ---")
 
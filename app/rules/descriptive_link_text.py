@@ -1,67 +1,68 @@
 # backend/app/rules/descriptive_link_text.py
 
-from bs4 import BeautifulSoup
-from typing import List
+import re
+from typing import List, Optional
+from lxml import etree
 from ..schemas import Issue, IssueNode, AiSuggestion
+from ._parse import parse, node_html
 
-def check_descriptive_link_text(html_content: str) -> List[Issue]:
+_LINKS_WITH_HREF = etree.XPath('//a[@href]')
+
+# Common non-descriptive phrases (case-insensitive), matched against the whole link text.
+# Tolerates any run of whitespace between words and one trailing '.', '!' or '?'.
+_NONDESC_RE = re.compile(
+    r'^\s*(?:click\s+here|read\s+more|learn\s+more|find\s+out\s+more|details|here|more)\s*[.!?]?\s*$',
+    re.I
+)
+
+def link_text_issue(link: etree._Element) -> Optional[Issue]:
+    """
+    Returns an issue if the <a href> element's own text is a non-descriptive phrase, else None.
+    Broad terms like 'more' or 'here' are only flagged when they are the entire link text,
+    so "More about pricing" or "Somewhere" are not reported.
+    """
+    get = link.get # Bound once; lxml attribute reads go straight to libxml2
+    # Skip links that have an aria-label or aria-labelledby, as these provide context
+    if get('aria-label') or get('aria-labelledby'):
+        return None
+
+    # Collapse whitespace so text split across child elements and line breaks reads as one phrase
+    link_text = ' '.join(link.text_content().split())
+
+    # Check if the stripped text is one of the non-descriptive phrases
+    if _NONDESC_RE.match(link_text):
+        issue_html = node_html(link)
+        return Issue(
+            id="custom-non-descriptive-link-text",
+            description="Link text is non-descriptive.",
+            help="Link text should be meaningful and unique, describing the purpose or destination of the link without relying on surrounding content. Generic phrases like 'click here' or 'read more' are unhelpful for screen reader users navigating by a list of links.",
+            severity="critical", # Can be moderate depending on context, but often critical for navigation
+            nodes=[IssueNode(html=issue_html, target=["a"])],
+            ai_suggestions=AiSuggestion(
+                short_fix="Revise link text to be descriptive of its destination or purpose.",
+                detailed_fix=f"The link: `{issue_html}` uses non-descriptive text ('{link_text}'). Change the link text to something that clearly indicates where the link leads or what action it performs. For example, instead of `<a href=\"/docs\">Read More</a>`, use `<a href=\"/docs\">Read our Documentation</a>`. If the link contains an icon, use `aria-label` to provide a descriptive name for screen readers, or visually hide the descriptive text within the link."
+            )
+        )
+    return None
+
+def check_descriptive_link_text(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
     """
     Checks for <a> elements that have non-descriptive link text such as
     "click here", "read more", "learn more", or variations thereof.
     This rule focuses on explicit text content and does not evaluate
     contextual descriptions unless provided via ARIA attributes.
+    `tree` may be a root already built with `_parse.parse` so the page is parsed only once.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    root = tree if tree is not None else parse(html_content)
     issues: List[Issue] = []
+    if root is None:
+        return issues
 
-    # Common non-descriptive phrases (case-insensitive)
-    non_descriptive_phrases = [
-        r'click here',
-        r'read more',
-        r'learn more',
-        r'find out more',
-        r'details',
-        r'here',
-        r'more'
-    ]
-    
-    # Regex to match phrases, accounting for potential leading/trailing punctuation or spaces
-    # Example: r'\bclick here\b' matches "click here" but not "unclick here"
-    # We need to be careful with broad terms like 'more' or 'here'
-    # For simplicity, we'll strip text and check for exact matches or very common patterns.
-    
-    # Find all <a> tags that have an href attribute and some text content (after stripping whitespace)
-    links = soup.find_all('a', href=True)
-
-    for link in links:
-        link_text = link.get_text(strip=True).lower()
-        
-        # Skip links that have an aria-label or aria-labelledby, as these provide context
-        if link.get('aria-label') or link.get('aria-labelledby'):
-            continue
-        
-        # Check if the stripped text matches any of the non-descriptive phrases
-        is_non_descriptive = False
-        for phrase in non_descriptive_phrases:
-            if link_text == phrase.replace(r'\b', '').strip() or \
-                (phrase == r'more' and 'more' in link_text) or \
-                (phrase == r'here' and 'here' in link_text) :
-                is_non_descriptive = True
-                break
-        
-        if is_non_descriptive:
-            issue_html = str(link)
-            issues.append(Issue(
-                id="custom-non-descriptive-link-text",
-                description="Link text is non-descriptive.",
-                help="Link text should be meaningful and unique, describing the purpose or destination of the link without relying on surrounding content. Generic phrases like 'click here' or 'read more' are unhelpful for screen reader users navigating by a list of links.",
-                severity="critical", # Can be moderate depending on context, but often critical for navigation
-                nodes=[IssueNode(html=issue_html, target=["a"])],
-                ai_suggestions=AiSuggestion(
-                    short_fix="Revise link text to be descriptive of its destination or purpose.",
-                    detailed_fix=f"The link: `{issue_html}` uses non-descriptive text ('{link_text}'). Change the link text to something that clearly indicates where the link leads or what action it performs. For example, instead of `<a href=\"/docs\">Read More</a>`, use `<a href=\"/docs\">Read our Documentation</a>`. If the link contains an icon, use `aria-label` to provide a descriptive name for screen readers, or visually hide the descriptive text within the link."
-                )
-            ))
+    # Find all <a> tags that have an href attribute
+    for link in _LINKS_WITH_HREF(root):
+        issue = link_text_issue(link)
+        if issue is not None:
+            issues.append(issue)
     return issues
 
 if __name__ == "__main__":
@@ -1,19 +1,21 @@
 # backend/app/rules/document_language.py
 
-from bs4 import BeautifulSoup
-from typing import List
+from typing import List, Optional
+from lxml import etree
 from ..schemas import Issue, IssueNode, AiSuggestion
+from ._parse import parse, opening_tag_html
 
-def check_document_language(html_content: str) -> List[Issue]:
+def check_document_language(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
     """
     Checks if the <html> element has a valid 'lang' attribute.
+    `tree` may be a root already built with `_parse.parse` so the page is parsed only once.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
     issues: List[Issue] = []
 
-    html_tag = soup.find('html')
+    # The parser supplies <html> for any non-empty document, so this is None only for empty input
+    html_tag = tree if tree is not None else parse(html_content)
 
-    if not html_tag:
+    if html_tag is None:
         # This is a very rare case for valid HTML, but handle defensively
         issues.append(Issue(
             id="custom-missing-html-tag",
@@ -36,7 +38,7 @@ def check_document_language(html_content: str) -> List[Issue]:
             description="The <html> element is missing a 'lang' attribute or its value is empty.",
             help="The 'lang' attribute on the <html> tag declares the primary human language of the document. This is crucial for screen readers to pronounce content correctly and for search engines.",
             severity="critical",
-            nodes=[IssueNode(html=str(html_tag), target=["html"])],
+            nodes=[IssueNode(html=opening_tag_html(html_tag), target=["html"])],
             ai_suggestions=AiSuggestion(
                 short_fix="Add `lang=\"en\"` (or appropriate language code) to the <html> tag.",
                 detailed_fix="Add the `lang` attribute to your `<html>` tag, specifying the primary language of the document using a valid ISO 639-1 language code (e.g., `en` for English, `es` for Spanish, `fr` for French). For example: `<html lang=\"en\">`. This helps assistive technologies to render content correctly and improves translation services."
@@ -1,53 +1,64 @@
 # backend/app/rules/empty_interactive.py
 
-from bs4 import BeautifulSoup
-from typing import List
+from typing import List, Optional
+from lxml import etree
 from ..schemas import Issue, IssueNode, AiSuggestion
+from ._parse import parse, node_html
 
-def check_empty_interactive_elements(html_content: str) -> List[Issue]:
+_INTERACTIVE = etree.XPath('//a | //button')
+
+def empty_interactive_issue(element: etree._Element) -> Optional[Issue]:
+    """Returns an issue if the <a>/<button> element has neither visible text nor an ARIA name, else None."""
+    get = element.get # Bound once; lxml attribute reads go straight to libxml2
+    # An accessible ARIA name is enough; check it before walking the subtree for text
+    if get('aria-label') or get('aria-labelledby'):
+        return None
+
+    # If the element has no visible text AND no accessible ARIA label
+    if not element.text_content().strip():
+        element_type = element.tag # 'a' or 'button'
+        issue_html = node_html(element)
+        
+        # Determine short and detailed fixes based on element type
+        if element_type == 'a':
+            short_fix = "Add descriptive text or an `aria-label` to the link."
+            detailed_fix = f"The link: `{issue_html}` is empty. Add meaningful, descriptive text between the `<a>` tags (e.g., `<a href=\"...\">Learn More about Product X</a>`). If the link contains an icon and no visible text, add an `aria-label` attribute describing its purpose (e.g., `<a href=\"...\" aria-label=\"View Profile\"><img src=\"profile.png\" alt=\"\"></a>`)."
+        elif element_type == 'button':
+            short_fix = "Add descriptive text or an `aria-label` to the button."
+            detailed_fix = f"The button: `{issue_html}` is empty. Add meaningful, descriptive text between the `<button>` tags (e.g., `<button type=\"submit\">Submit Form</button>`). If the button contains only an icon, provide an `aria-label` attribute describing its action (e.g., `<button aria-label=\"Delete Item\"><span class=\"icon-trash\"></span></button>`)."
+        else: # Fallback for unexpected types, though limited to a/button
+            short_fix = f"Provide an accessible name for the {element_type} element."
+            detailed_fix = f"The {element_type} element: `{issue_html}` is missing an accessible name. Ensure it has visible text content or an `aria-label` attribute to convey its purpose to assistive technologies."
+
+        return Issue(
+            id=f"custom-empty-{element_type}",
+            description=f"Empty {element_type} element detected.",
+            help=f"Interactive elements like {element_type} must have an accessible name (visible text, `aria-label`, or `aria-labelledby`) to inform screen reader users of their purpose. Empty {element_type} elements are skipped by screen readers or announced generically, making them unusable.",
+            severity="critical", # Empty interactive elements are a major barrier
+            nodes=[IssueNode(html=issue_html, target=[element_type])],
+            ai_suggestions=AiSuggestion(
+                short_fix=short_fix,
+                detailed_fix=detailed_fix
+            )
+        )
+    return None
+
+def check_empty_interactive_elements(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
     """
     Checks for <a> and <button> elements that are empty or contain only whitespace,
     and lack an accessible name via aria-label or aria-labelledby.
+    `tree` may be a root already built with `_parse.parse` so the page is parsed only once.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    root = tree if tree is not None else parse(html_content)
     issues: List[Issue] = []
+    if root is None:
+        return issues
 
     # Find all <a> and <button> tags
-    interactive_elements = soup.find_all(['a', 'button'])
-
-    for element in interactive_elements:
-        # Check for visible text content or accessible name attributes
-        has_visible_text = bool(element.get_text(strip=True))
-        has_aria_label = bool(element.get('aria-label') or element.get('aria-labelledby'))
-        
-        # If the element has no visible text AND no accessible ARIA label
-        if not has_visible_text and not has_aria_label:
-            element_type = element.name # 'a' or 'button'
-            issue_html = str(element)
-            
-            # Determine short and detailed fixes based on element type
-            if element_type == 'a':
-                short_fix = "Add descriptive text or an `aria-label` to the link."
-                detailed_fix = f"The link: `{issue_html}` is empty. Add meaningful, descriptive text between the `<a>` tags (e.g., `<a href=\"...\">Learn More about Product X</a>`). If the link contains an icon and no visible text, add an `aria-label` attribute describing its purpose (e.g., `<a href=\"...\" aria-label=\"View Profile\"><img src=\"profile.png\" alt=\"\"></a>`)."
-            elif element_type == 'button':
-                short_fix = "Add descriptive text or an `aria-label` to the button."
-                detailed_fix = f"The button: `{issue_html}` is empty. Add meaningful, descriptive text between the `<button>` tags (e.g., `<button type=\"submit\">Submit Form</button>`). If the button contains only an icon, provide an `aria-label` attribute describing its action (e.g., `<button aria-label=\"Delete Item\"><span class=\"icon-trash\"></span></button>`)."
-            else: # Fallback for unexpected types, though limited to a/button
-                short_fix = f"Provide an accessible name for the {element_type} element."
-                detailed_fix = f"The {element_type} element: `{issue_html}` is missing an accessible name. Ensure it has visible text content or an `aria-label` attribute to convey its purpose to assistive technologies."
-
-
-            issues.append(Issue(
-                id=f"custom-empty-{element_type}",
-                description=f"Empty {element_type} element detected.",
-                help=f"Interactive elements like {element_type} must have an accessible name (visible text, `aria-label`, or `aria-labelledby`) to inform screen reader users of their purpose. Empty {element_type} elements are skipped by screen readers or announced generically, making them unusable.",
-                severity="critical", # Empty interactive elements are a major barrier
-                nodes=[IssueNode(html=issue_html, target=[element_type])],
-                ai_suggestions=AiSuggestion(
-                    short_fix=short_fix,
-                    detailed_fix=detailed_fix
-                )
-            ))
+    for element in _INTERACTIVE(root):
+        issue = empty_interactive_issue(element)
+        if issue is not None:
+            issues.append(issue)
     return issues
 
 if __name__ == "__main__":
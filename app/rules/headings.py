@@ -1,21 +1,42 @@
 # backend/app/rules/headings.py
 
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from lxml import etree
 from ..schemas import Issue, IssueNode, AiSuggestion
+from ._parse import parse, node_html
 
-def check_heading_structure(html_content: str) -> List[Issue]:
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+_HEADINGS = etree.XPath(' | '.join(f'//{tag}' for tag in HEADING_TAGS))
+
+def check_heading_structure(html_content: str, tree: Optional[etree._Element] = None) -> List[Issue]:
     """
     Checks for common heading structure issues (missing H1, skipped heading levels).
     Note: This is a simplified check. Comprehensive heading validation is complex
     and would require more sophisticated DOM traversal and state tracking.
+    `tree` may be a root already built with `_parse.parse` so the page is parsed only once.
+    """
+    root = tree if tree is not None else parse(html_content)
+
+    # Single pass over all headings: remember the first heading of each level, in document order.
+    # Both rules are answered from this map, so the tree is walked only once.
+    first_by_level: Dict[int, etree._Element] = {}
+    if root is not None:
+        for heading in _HEADINGS(root):
+            level = int(heading.tag[1]) # Extracts the number from 'h1', 'h2', etc.
+            if level not in first_by_level:
+                first_by_level[level] = heading
+
+    return heading_issues(first_by_level)
+
+def heading_issues(first_by_level: Dict[int, etree._Element]) -> List[Issue]:
+    """
+    Builds the heading-structure issues from a map of heading level (1-6) to the first
+    heading element of that level in document order.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
     issues: List[Issue] = []
 
     # Rule 1: Check for missing H1
-    h1_tags = soup.find_all('h1')
-    if not h1_tags:
+    if 1 not in first_by_level:
         issues.append(Issue(
             id="custom-missing-h1",
             description="Page should have at least one H1 heading.",
@@ -45,15 +66,12 @@ def check_heading_structure(html_content: str) -> List[Issue]:
     # This checks for direct jumps in heading levels (e.g., h1 to h3, h2 to h4).
     # A proper check would traverse the DOM tree, but this simpler version checks for missing levels in the set of all found headings.
 
-    all_headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-    
-    found_levels = set()
-    for heading in all_headings:
-        level = int(heading.name[1]) # Extracts the number from 'h1', 'h2', etc.
-        found_levels.add(level)
+    # A skip needs at least two distinct levels; most pages stop here.
+    if len(first_by_level) < 2:
+        return issues
 
-    # Convert set to sorted list for easier iteration
-    sorted_found_levels = sorted(list(found_levels))
+    # At most six levels, so sorting the keys is trivial (no set or list round-trip needed)
+    sorted_found_levels = sorted(first_by_level)
 
     for i in range(len(sorted_found_levels) - 1):
         current_level = sorted_found_levels[i]
@@ -70,8 +88,8 @@ def check_heading_structure(html_content: str) -> List[Issue]:
                 severity="moderate",
                 nodes=[
                     # Provide context by including the HTML of the current and next heading if possible
-                    IssueNode(html=str(soup.find(f'h{current_level}')), target=[f'h{current_level}']),
-                    IssueNode(html=str(soup.find(f'h{next_level}')), target=[f'h{next_level}'])
+                    IssueNode(html=node_html(first_by_level[current_level]), target=[f'h{current_level}']),
+                    IssueNode(html=node_html(first_by_level[next_level]), target=[f'h{next_level}'])
                 ],
                 ai_suggestions=AiSuggestion(
                     short_fix=f"Ensure consecutive heading levels (e.g., H{current_level} then H{current_level + 1}).",
@@ -1,8 +1,9 @@
 # backend/app/schemas.py
 
 from pydantic import BaseModel, HttpUrl, Field, GetCoreSchemaHandler
-from typing import List, Dict, Any, Optional, ClassVar
+from typing import List, Any, Optional, ClassVar
 from bson import ObjectId
+from bson.errors import InvalidId
 from pydantic_core import core_schema
 from datetime import datetime, timezone
 
@@ -13,11 +14,8 @@ class PyObjectId(ObjectId):
     Handles both validation from MongoDB (ObjectId) and string, and serialization to string.
     """
 
-    @classmethod
-    def __get_validators__(cls):
-        # This method is for Pydantic V1 compatibility or when used with Annotated.
-        # For V2, __get_pydantic_core_schema__ is more direct.
-        yield cls.validate
+    # The core schema never depends on the model it is used in, so it is built once and reused
+    _cached_core_schema: ClassVar[Optional[core_schema.CoreSchema]] = None
 
     @classmethod
     def validate(cls, v: Any) -> ObjectId:
@@ -28,9 +26,11 @@ class PyObjectId(ObjectId):
         if isinstance(v, ObjectId):
             return v
         if isinstance(v, str):
-            if ObjectId.is_valid(v): # Check if the string is a valid ObjectId
+            # ObjectId() validates while parsing, so a separate ObjectId.is_valid() would parse twice
+            try:
                 return ObjectId(v)
-            raise ValueError(f"Invalid ObjectId string: '{v}'")
+            except InvalidId:
+                raise ValueError(f"Invalid ObjectId string: '{v}'") from None
         raise ValueError("Invalid ObjectId type or format")
 
     @classmethod
@@ -42,29 +42,28 @@ class PyObjectId(ObjectId):
         # and if that fails, it tries to directly accept a bson.ObjectId.
         # Then, after validation, it applies `cls.validate`.
         # For serialization, it explicitly converts to a string.
-        return core_schema.no_info_after_validator_function(
-            cls.validate,
-            core_schema.union_schema([
-                core_schema.is_instance_schema(ObjectId), # Allow direct ObjectId instance
-                core_schema.str_schema() # Allow string representation
-            ]),
-            serialization=core_schema.to_string_ser_schema() # Always serialize to string
-        )
-
-    # Required for Pydantic to handle default_factory and comparison correctly
-    def __eq__(self, other):
-        if isinstance(other, ObjectId):
-            return self.binary == other.binary
-        return NotImplemented
-
-    def __hash__(self):
-        return self.binary.__hash__()
+        if cls._cached_core_schema is None:
+            cls._cached_core_schema = core_schema.no_info_after_validator_function(
+                cls.validate,
+                core_schema.union_schema([
+                    core_schema.is_instance_schema(ObjectId), # Allow direct ObjectId instance
+                    core_schema.str_schema() # Allow string representation
+                ]),
+                serialization=core_schema.to_string_ser_schema() # Always serialize to string
+            )
+        return cls._cached_core_schema
+
+    # Equality and hashing are inherited from bson.ObjectId, which already compares
+    # the raw 12-byte ids (and so matches plain ObjectId instances as well).
 
 # --- Analysis Request Schema (for POST /analyze) ---
 class AnalysisRequest(BaseModel):
     url: HttpUrl = Field(..., example="https://www.google.com")
 
-# ... (rest of your schemas remain exactly the same as previously provided) ...
+# Note: the issue schemas below stay plain BaseModels. Pydantic v2 keeps field values in the
+# instance __dict__ by design (its own bookkeeping attributes are already slotted) and offers no
+# `slots` model option, so the per-instance footprint cannot be cut further without giving up
+# BaseModel's validation and model_dump() used by the routes and repository.
 
 # --- AI Suggestion Schema ---
 class AiSuggestion(BaseModel):
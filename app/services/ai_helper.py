@@ -1,47 +1,329 @@
 # backend/app/services/ai_helper.py
 
+import asyncio
 import os
-from dotenv import load_dotenv
-import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import hashlib
+import json # Only for human-readable logging; requests and responses use orjson
+import orjson
 import httpx # Using httpx for async HTTP requests
 import logging # Import logging
-from typing import Dict, Optional, Any
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Any
+from pymongo import UpdateOne
 
 # Configure logging for this module
 logger = logging.getLogger("accessibility_analyzer_backend.services.ai_helper")
 
-# Load environment variables from .env file (if running locally).
-# This needs to be called at the start of your application where env vars are accessed.
-# In a full FastAPI app, it might be in main.py or a config module, but for now, here is fine.
-load_dotenv()
+# The .env file is loaded once by app/main.py at startup (before any router import), so this
+# module only reads the already-populated environment.
+
+@lru_cache(maxsize=1)
+def _get_api_key() -> Optional[str]:
+    """
+    Retrieves the Gemini API key from environment variables on first use.
+    This key should be set in your .env file at the backend root.
+    Cached; tests can call `_get_api_key.cache_clear()` (and `_gemini_request_url.cache_clear()`) after changing the environment.
+    """
+    return os.getenv("GEMINI_API_KEY")
 
-# Retrieve the Gemini API key from environment variables.
-# This key should be set in your .env file at the backend root.
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # The endpoint for the Gemini 2.0 Flash model.
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+_GEMINI_HEADERS = {'Content-Type': 'application/json'}
+
+@lru_cache(maxsize=1)
+def _gemini_request_url() -> httpx.URL:
+    """
+    The endpoint with the API key as its `key` query parameter, parsed into an httpx.URL once
+    instead of formatting and re-parsing the URL string on every request.
+    Cached like _get_api_key; clear both after changing the environment.
+    """
+    return httpx.URL(GEMINI_API_URL, params={"key": _get_api_key()})
+
+# One HTTP/2 client shared by every suggestion request, so connections (and their TLS sessions)
+# to the Gemini endpoint are pooled instead of re-established per issue. Created on first use
+# and closed by close_ai_client() on application shutdown.
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """Returns the shared AsyncClient, creating it if it does not exist yet (or was closed)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        )
+    return _client
+
+class _RateLimiter:
+    """
+    Async sliding-window limiter: at most `max_rate` acquisitions per `period` seconds.
+    Callers over the limit sleep until the oldest acquisition leaves the window, so bursts
+    are spread out instead of being rejected by Gemini's per-minute quota with a 429.
+    """
+
+    def __init__(self, max_rate: int, period: float = 60.0):
+        self.max_rate = max_rate
+        self.period = period
+        self._timestamps: "deque[float]" = deque()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "_RateLimiter":
+        async with self._lock: # One waiter at a time, so waiters are served in arrival order
+            while True:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= self.period:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.max_rate:
+                    self._timestamps.append(now)
+                    return self
+                await asyncio.sleep(self.period - (now - self._timestamps[0]))
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+# Bound how many Gemini requests are in flight and how many start per minute, so a page with
+# many distinct issues stays inside the API quota instead of bursting into 429s.
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+_gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+_gemini_rate_limiter = _RateLimiter(GEMINI_REQUESTS_PER_MINUTE, 60.0)
+
+# Transient Gemini failures (rate limiting, overload) are retried with jittered exponential
+# backoff instead of immediately turning into a placeholder suggestion.
+GEMINI_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+GEMINI_MAX_ATTEMPTS = 5
+_RETRY_BASE_DELAY = 0.5 # seconds
+_RETRY_MAX_DELAY = 8.0 # seconds, cap for the computed backoff
+_RETRY_AFTER_MAX = 60.0 # seconds, cap for a server-supplied Retry-After
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds, if present."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+async def _post_gemini(body: bytes) -> httpx.Response:
+    """
+    POSTs a serialized generateContent payload (see _build_payload) through the shared client, within the concurrency and
+    rate limits. 429 and 5xx responses are retried (honouring Retry-After when the server
+    sends one) up to GEMINI_MAX_ATTEMPTS times; any other 4xx, or the last failed attempt,
+    raises httpx.HTTPStatusError.
+    """
+    request_url = _gemini_request_url() # API key already attached as a query parameter
+    for attempt in range(1, GEMINI_MAX_ATTEMPTS + 1):
+        async with _gemini_semaphore, _gemini_rate_limiter:
+            response = await _get_client().post(request_url, headers=_GEMINI_HEADERS, content=body) # 60s timeout set on the client
+
+        if response.status_code not in GEMINI_RETRY_STATUSES or attempt == GEMINI_MAX_ATTEMPTS:
+            response.raise_for_status() # Raise an exception for bad HTTP status codes (4xx or 5xx)
+            return response
+
+        # Sleep outside the semaphore so other requests can use the slot meanwhile
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** attempt)) # Full jitter
+        else:
+            delay = min(delay, _RETRY_AFTER_MAX)
+        logger.warning(f"Gemini API returned {response.status_code}; retrying in {delay:.1f}s (attempt {attempt}/{GEMINI_MAX_ATTEMPTS}).")
+        await asyncio.sleep(delay)
+
+# Error bodies are only surfaced as a short excerpt; under a burst of 429s the full payloads
+# would otherwise be decoded and written to the log for every failed call.
+_ERROR_DETAIL_MAX_CHARS = 200
+
+def _error_detail(response: httpx.Response) -> str:
+    """Returns at most _ERROR_DETAIL_MAX_CHARS of an error response body, decoding only that prefix."""
+    # UTF-8 needs at most 4 bytes per character, so this slice always covers the excerpt
+    excerpt = response.content[:_ERROR_DETAIL_MAX_CHARS * 4].decode("utf-8", errors="replace")
+    if len(excerpt) > _ERROR_DETAIL_MAX_CHARS or len(response.content) > _ERROR_DETAIL_MAX_CHARS * 4:
+        return excerpt[:_ERROR_DETAIL_MAX_CHARS] + "..."
+    return excerpt
+
+async def close_ai_client() -> None:
+    """Closes the shared Gemini HTTP client, if it was ever created, and detaches the suggestion store."""
+    global _client
+    set_suggestion_store(None)
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Gemini HTTP client closed.")
+
+# Exact-match cache of parsed suggestions. Pages repeat the same violation many times (e.g. every
+# image missing alt text shares the description and help), so identical requests are answered
+# from memory instead of another Gemini round trip. Bounded LRU: the least recently used entry
+# is evicted once the cache is full. Only successfully parsed suggestions are stored.
+AI_SUGGESTION_CACHE_SIZE = 2048
+_suggestion_cache: "OrderedDict[bytes, Dict[str, str]]" = OrderedDict()
+
+def _normalize_for_cache(text: str) -> str:
+    """
+    Collapses whitespace runs so snippets that differ only in indentation or line breaks
+    (common between the same component rendered in different places) share a cache entry.
+    """
+    return " ".join(text.split())
+
+def _suggestion_cache_key(issue_description: str, issue_help: str, issue_html_node: str) -> bytes:
+    """Fixed-size digest of the normalized prompt inputs, so long HTML snippets are not kept as keys."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (issue_description, issue_help, _normalize_for_cache(issue_html_node)):
+        data = part.encode("utf-8")
+        # Length-prefix each part so different splits of the same text cannot collide
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return hasher.digest()
+
+def _cache_suggestion(key: bytes, suggestion: Dict[str, str]) -> None:
+    """Stores a parsed suggestion, evicting the least recently used entry when full."""
+    _suggestion_cache[key] = suggestion
+    _suggestion_cache.move_to_end(key)
+    if len(_suggestion_cache) > AI_SUGGESTION_CACHE_SIZE:
+        _suggestion_cache.popitem(last=False)
+
+# Persistent second level behind the in-memory cache: a MongoDB collection (with a TTL index,
+# see database/connection.py) keyed by the same digest, so suggestions survive restarts and are
+# shared between workers. Registered by the application at startup via set_suggestion_store();
+# while it is None (e.g. running this module standalone) only the in-memory cache is used.
+_suggestion_store = None
+
+def set_suggestion_store(collection) -> None:
+    """Registers the Motor collection used to persist suggestions (None disables persistence)."""
+    global _suggestion_store
+    _suggestion_store = collection
+
+async def _load_persisted_suggestions(keys: List[bytes]) -> Dict[bytes, Dict[str, str]]:
+    """
+    Looks up `keys` in the persistent store with a single query. Hits are also copied into the
+    in-memory cache. Store errors are logged and treated as misses.
+    """
+    if _suggestion_store is None or not keys:
+        return {}
+    found: Dict[bytes, Dict[str, str]] = {}
+    try:
+        async for doc in _suggestion_store.find({"_id": {"$in": keys}}, {"short_fix": 1, "detailed_fix": 1}):
+            suggestion = {"short_fix": doc["short_fix"], "detailed_fix": doc["detailed_fix"]}
+            found[doc["_id"]] = suggestion
+            _cache_suggestion(doc["_id"], dict(suggestion))
+    except Exception as e:
+        logger.warning(f"Could not read persisted AI suggestions: {e}")
+    return found
+
+async def _persist_suggestions(suggestions: Dict[bytes, Dict[str, str]]) -> None:
+    """Upserts parsed suggestions into the persistent store in one bulk write. Errors are only logged."""
+    if _suggestion_store is None or not suggestions:
+        return
+    now = datetime.now(timezone.utc) # The TTL index expires entries relative to this
+    try:
+        await _suggestion_store.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": key},
+                    {"$set": {"short_fix": suggestion["short_fix"], "detailed_fix": suggestion["detailed_fix"], "created_at": now}},
+                    upsert=True
+                )
+                for key, suggestion in suggestions.items()
+            ],
+            ordered=False
+        )
+    except Exception as e:
+        logger.warning(f"Could not persist AI suggestions: {e}")
+
+# Static prompt text, built once at import and sent as Gemini's `systemInstruction`, so the
+# per-issue prompt formatted for each request carries only the issue itself. This only saves
+# building (and re-sending inside the user turn) the same instructions per call; the preamble
+# is far below Gemini's minimum size for context caching, so no server-side cache hit is expected.
+_PROMPT_PREAMBLE = "You are an expert web accessibility consultant. The tone should be professional, helpful, and action-oriented."
+_SINGLE_SYSTEM_INSTRUCTION = {"parts": [{"text": _PROMPT_PREAMBLE + """
+Provide a concise "short fix" and a detailed "detailed fix" for the accessibility issue you are given: its description, its help text and the problematic HTML element.
+Provide the response in JSON format with two keys: "short_fix" and "detailed_fix".
+Ensure the JSON is perfectly valid and ready for direct parsing.
+Example:
+{
+    "short_fix": "Add alt text to the image.",
+    "detailed_fix": "For the image `<img>`, add an `alt` attribute that describes its content or purpose. If purely decorative, use `alt=\"\"`."
+}"""}]}
+_BATCH_SYSTEM_INSTRUCTION = {"parts": [{"text": _PROMPT_PREAMBLE + """
+You are given a JSON array of accessibility issues. Each issue has an "idx", a "description" of the issue, its "help" text and the problematic "html" element.
+For each issue, provide a concise "short fix" and a detailed "detailed fix".
+Respond with a JSON array containing exactly one object per issue, each with the keys "idx" (copied from the issue), "short_fix" and "detailed_fix".
+Ensure the JSON is perfectly valid and ready for direct parsing."""}]}
+
+# Placeholder suggestions returned when no usable suggestion can be produced. Built once and
+# shared, so callers must treat them as read-only (they are only copied into AiSuggestion models).
+_API_KEY_MISSING_FALLBACK = {
+    "short_fix": "AI suggestions not available (API key missing).",
+    "detailed_fix": "Please set the GEMINI_API_KEY environment variable in your .env file."
+}
+_UNEXPECTED_STRUCTURE_FALLBACK = {
+    "short_fix": "AI suggestions generation failed.",
+    "detailed_fix": "Gemini API did not return expected content structure."
+}
+_EXTRACTION_ERROR_FALLBACK = {
+    "short_fix": "AI suggestions extraction error.",
+    "detailed_fix": "Gemini API response format was not as expected."
+}
+_PARSING_ERROR_FALLBACK = {
+    "short_fix": "AI suggestions parsing error.",
+    "detailed_fix": "Gemini API returned unparseable JSON."
+}
+_INCOMPLETE_FALLBACK = {
+    "short_fix": "AI suggestions incomplete.",
+    "detailed_fix": "Gemini API returned an incomplete response."
+}
 
 def extract_json_from_text(text: str) -> Optional[str]:
     """
     Attempts to extract a JSON string from a text, handling cases where it's wrapped
     in markdown code blocks.
     """
-    if text.strip().startswith('{') and text.strip().endswith('}'):
-        return text.strip()
+    stripped = text.strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
+        return stripped
     
     # Try to find JSON within a markdown code block
-    # This regex is simplified; for more complex cases, a proper JSON parser might be needed
-    # or more sophisticated regex.
     # Pattern: ```json\n (.*) \n```
-    start_tag = "```json\n"
-    end_tag = "\n```"
-    if start_tag in text and end_tag in text:
-        start_index = text.find(start_tag) + len(start_tag)
-        end_index = text.find(end_tag, start_index)
-        if start_index != -1 and end_index != -1:
-            return text[start_index:end_index].strip()
-    return None
+    # partition() scans the text once per tag instead of an `in` test followed by find().
+    _, found_start, rest = text.partition("```json\n")
+    if not found_start:
+        return None
+    body, found_end, _ = rest.partition("\n```")
+    if not found_end:
+        return None
+    return body.strip()
+
 
+def _error_fallback(error: BaseException) -> Dict[str, str]:
+    """Returns the placeholder suggestion for a Gemini call that raised `error`."""
+    if isinstance(error, httpx.RequestError):
+        return {
+            "short_fix": "AI suggestion API request error.",
+            "detailed_fix": f"Network or API connectivity issue: {error}"
+        }
+    if isinstance(error, httpx.HTTPStatusError):
+        return {
+            "short_fix": "AI suggestion API returned error status.",
+            "detailed_fix": f"Gemini API returned an error: Status {error.response.status_code}, Detail: {_error_detail(error.response)}"
+        }
+    return {
+        "short_fix": "AI suggestion internal error.",
+        "detailed_fix": f"An unexpected error occurred during AI suggestion generation: {error}"
+    }
 
 async def get_ai_suggestions(issue_description: str, issue_help: str, issue_html_node: str) -> Dict[str, str]:
     """
@@ -60,133 +342,272 @@ async def get_ai_suggestions(issue_description: str, issue_help: str, issue_html
                             Returns placeholder messages if the API key is missing or the API call fails.
     """
     # Check if the API key is available before making the request.
-    if not GEMINI_API_KEY:
+    if not _get_api_key():
         logger.warning("GEMINI_API_KEY environment variable is not set. AI suggestions will not be generated.")
-        return {
-            "short_fix": "AI suggestions not available (API key missing).",
-            "detailed_fix": "Please set the GEMINI_API_KEY environment variable in your .env file."
-        }
+        return _API_KEY_MISSING_FALLBACK
+
+    cache_key = _suggestion_cache_key(issue_description, issue_help, issue_html_node)
+    cached = _suggestion_cache.get(cache_key)
+    if cached is not None:
+        _suggestion_cache.move_to_end(cache_key)
+        logger.debug("AI suggestion served from cache.")
+        return dict(cached) # Callers get their own copy
+    persisted = (await _load_persisted_suggestions([cache_key])).get(cache_key)
+    if persisted is not None:
+        logger.debug("AI suggestion served from the persistent cache.")
+        return persisted
 
     # Construct the prompt for the Gemini model.
     # The prompt guides the AI to act as an accessibility expert and to provide
     # solutions in a specific format (JSON).
+    # The static instructions travel as the system instruction; the prompt carries only the issue.
     prompt = f"""
-    You are an expert web accessibility consultant. Provide a concise "short fix" and a detailed "detailed fix" for the following accessibility issue. The tone should be professional, helpful, and action-oriented.
-
     **Accessibility Issue:** {issue_description}
     **Help Text:** {issue_help}
     **Problematic HTML Element:** `{issue_html_node}`
-
-    Provide the response in JSON format with two keys: "short_fix" and "detailed_fix".
-    Ensure the JSON is perfectly valid and ready for direct parsing.
-    Example:
-    {{
-        "short_fix": "Add alt text to the image.",
-        "detailed_fix": "For the image `<img>`, add an `alt` attribute that describes its content or purpose. If purely decorative, use `alt=\"\"`."
-    }}
     """
 
-    # Define the payload for the Gemini API request.
-    # We specify `responseMimeType` and `responseSchema` to encourage the model
-    # to return a structured JSON response, making parsing more reliable.
-    payload = {
-        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
-        "generationConfig": {
-            "responseMimeType": "application/json", # Tells Gemini to aim for JSON output
-            "responseSchema": { # Defines the expected JSON structure
-                "type": "OBJECT",
-                "properties": {
-                    "short_fix": {"type": "STRING"},
-                    "detailed_fix": {"type": "STRING"}
-                },
-                "required": ["short_fix", "detailed_fix"]
-            }
-        }
-    }
-
-    # Set HTTP headers for the request.
-    headers = {
-        'Content-Type': 'application/json',
-    }
-    # Append the API key as a query parameter to the URL.
-    request_url = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
+    body = _build_payload(prompt, _SINGLE_PAYLOAD_TAIL)
 
     try:
-        # Use httpx.AsyncClient for asynchronous HTTP requests.
+        # Shared client (kept-alive connection to Gemini) behind the concurrency and rate limits.
         # This is important for a FastAPI app to remain non-blocking.
-        async with httpx.AsyncClient() as client:
-            response = await client.post(request_url, headers=headers, json=payload, timeout=60.0) # Increased timeout
-            response.raise_for_status() # Raise an exception for bad HTTP status codes (4xx or 5xx)
-            
-            result = response.json()
+        response = await _post_gemini(body)
+        
+        result = orjson.loads(response.content)
+        if logger.isEnabledFor(logging.DEBUG): # Skip serializing the whole response unless it is logged
             logger.debug(f"Gemini raw response: {json.dumps(result, indent=2)}") # Log the raw response
 
-            # Navigate through the nested structure of the Gemini API response
-            if result and 'candidates' in result and result['candidates']:
-                first_candidate = result['candidates'][0]
-                if 'content' in first_candidate and 'parts' in first_candidate['content']:
-                    for part in first_candidate['content']['parts']:
-                        if 'text' in part:
-                            extracted_json_str = extract_json_from_text(part['text'])
-                            if extracted_json_str:
-                                try:
-                                    # The model returns the JSON object as a string, so we need to parse it again.
-                                    ai_suggestions = json.loads(extracted_json_str)
-                                    # Validate that the expected keys are present in the parsed JSON.
-                                    if "short_fix" in ai_suggestions and "detailed_fix" in ai_suggestions:
-                                        logger.info("Successfully received and parsed AI suggestions from Gemini.")
-                                        return ai_suggestions
-                                    else:
-                                        logger.warning(f"Gemini response missing expected keys: {ai_suggestions}")
-                                        return {
-                                            "short_fix": "AI suggestions incomplete.",
-                                            "detailed_fix": "Gemini API returned an incomplete response."
-                                        }
-                                except json.JSONDecodeError:
-                                    logger.warning(f"Could not parse Gemini response text as valid JSON: {extracted_json_str}")
-                                    return {
-                                        "short_fix": "AI suggestions parsing error.",
-                                        "detailed_fix": "Gemini API returned unparseable JSON."
-                                    }
-                            else:
-                                logger.warning(f"Could not extract JSON from Gemini response text: {part['text']}")
-                                return {
-                                    "short_fix": "AI suggestions extraction error.",
-                                    "detailed_fix": "Gemini API response format was not as expected."
-                                }
+        # The suggestion is the first part of the first candidate; anything else is an unexpected shape
+        try:
+            text = result['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError):
             logger.warning("Gemini API response structure unexpected or empty.")
-            return {
-                "short_fix": "AI suggestions generation failed.",
-                "detailed_fix": "Gemini API did not return expected content structure."
-            }
+            return _UNEXPECTED_STRUCTURE_FALLBACK
+
+        extracted_json_str = extract_json_from_text(text)
+        if not extracted_json_str:
+            logger.warning(f"Could not extract JSON from Gemini response text: {text}")
+            return _EXTRACTION_ERROR_FALLBACK
+        try:
+            # The model returns the JSON object as a string, so we need to parse it again.
+            ai_suggestions = orjson.loads(extracted_json_str)
+        except orjson.JSONDecodeError:
+            logger.warning(f"Could not parse Gemini response text as valid JSON: {extracted_json_str}")
+            return _PARSING_ERROR_FALLBACK
+        # Validate that the expected keys are present in the parsed JSON.
+        if not isinstance(ai_suggestions, dict) or "short_fix" not in ai_suggestions or "detailed_fix" not in ai_suggestions:
+            logger.warning(f"Gemini response missing expected keys: {ai_suggestions}")
+            return _INCOMPLETE_FALLBACK
+        logger.info("Successfully received and parsed AI suggestions from Gemini.")
+        _cache_suggestion(cache_key, dict(ai_suggestions))
+        await _persist_suggestions({cache_key: ai_suggestions})
+        return ai_suggestions
 
     except httpx.RequestError as e:
         # Handle network-related errors during the HTTP request.
         logger.error(f"HTTPX request error during Gemini API call: {e}", exc_info=True)
-        return {
-            "short_fix": "AI suggestion API request error.",
-            "detailed_fix": f"Network or API connectivity issue: {e}"
-        }
+        return _error_fallback(e)
     except httpx.HTTPStatusError as e:
         # Handle HTTP status errors returned by the Gemini API.
-        logger.error(f"HTTP error during Gemini API call: {e.response.status_code} - {e.response.text}", exc_info=True)
-        return {
-            "short_fix": "AI suggestion API returned error status.",
-            "detailed_fix": f"Gemini API returned an error: Status {e.response.status_code}, Detail: {e.response.text}"
-        }
+        logger.error(f"HTTP error during Gemini API call: {e.response.status_code} - {_error_detail(e.response)}", exc_info=True)
+        return _error_fallback(e)
     except Exception as e:
         # Catch any other unexpected errors.
         logger.error(f"An unexpected error occurred during Gemini API call: {e}", exc_info=True)
-        return {
-            "short_fix": "AI suggestion internal error.",
-            "detailed_fix": f"An unexpected error occurred during AI suggestion generation: {e}"
-        }
+        return _error_fallback(e)
+
+async def get_ai_suggestions_many(issues: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Requests one suggestion per issue with get_ai_suggestions, all concurrently instead of
+    awaiting each call in turn. The number of requests actually in flight is still bounded by
+    the module's Gemini semaphore and rate limiter in _post_gemini.
+
+    Args:
+        issues (List[Dict[str, str]]): One dict per issue with 'description', 'help' and 'html' keys.
+
+    Returns:
+        List[Dict[str, str]]: One suggestion dict ('short_fix', 'detailed_fix') per input issue, in order.
+    """
+    return list(await asyncio.gather(
+        *(get_ai_suggestions(issue["description"], issue["help"], issue["html"]) for issue in issues)
+    ))
+
+# Issues per batched Gemini request. Keeps each response well inside the model's output limit;
+# larger pages are split into several batches that are sent concurrently.
+AI_BATCH_SIZE = 20
+
+# Structured-output schema for a single suggestion
+_SINGLE_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "short_fix": {"type": "STRING"},
+        "detailed_fix": {"type": "STRING"}
+    },
+    "required": ["short_fix", "detailed_fix"]
+}
+
+# Structured-output schema for a batch: one object per issue, tagged with the issue's index
+_BATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "idx": {"type": "INTEGER"},
+            "short_fix": {"type": "STRING"},
+            "detailed_fix": {"type": "STRING"}
+        },
+        "required": ["idx", "short_fix", "detailed_fix"]
+    }
+}
+
+# The request parts that never change, serialized once at import. Only the prompt is encoded
+# per call and spliced in front of these bytes by _build_payload.
+_SINGLE_PAYLOAD_TAIL = orjson.dumps({
+    "systemInstruction": _SINGLE_SYSTEM_INSTRUCTION,
+    # We specify `responseMimeType` and `responseSchema` to encourage the model
+    # to return a structured JSON response, making parsing more reliable.
+    "generationConfig": {
+        "responseMimeType": "application/json", # Tells Gemini to aim for JSON output
+        "responseSchema": _SINGLE_RESPONSE_SCHEMA
+    }
+})
+_BATCH_PAYLOAD_TAIL = orjson.dumps({
+    "systemInstruction": _BATCH_SYSTEM_INSTRUCTION,
+    "generationConfig": {
+        "responseMimeType": "application/json",
+        "responseSchema": _BATCH_RESPONSE_SCHEMA
+    }
+})
+
+def _build_payload(prompt: str, payload_tail: bytes) -> bytes:
+    """
+    Builds the generateContent request body for `prompt`: the user turn followed by the
+    pre-serialized fields of `payload_tail` (an orjson-encoded object).
+    """
+    return b'{"contents":[{"role":"user","parts":[{"text":' + orjson.dumps(prompt) + b'}]}],' + payload_tail[1:]
+
+async def _request_suggestion_batch(batch: List[Dict[str, str]]) -> Dict[int, Dict[str, str]]:
+    """
+    Sends one Gemini request covering every issue in `batch` and returns the parsed
+    suggestions keyed by their position in the batch. Entries the model left out (or that
+    could not be parsed) are simply absent; network and HTTP errors propagate to the caller.
+    """
+    issues_json = orjson.dumps(
+        [
+            {"idx": idx, "description": issue["description"], "help": issue["help"], "html": issue["html"]}
+            for idx, issue in enumerate(batch)
+        ]
+    ).decode("utf-8") # orjson never escapes non-ASCII text
+    prompt = f"""
+    **Issues:** {issues_json}
+    """
+    response = await _post_gemini(_build_payload(prompt, _BATCH_PAYLOAD_TAIL))
+    result = orjson.loads(response.content)
+
+    suggestions: Dict[int, Dict[str, str]] = {}
+    try:
+        text = "".join(part.get("text", "") for part in result["candidates"][0]["content"]["parts"])
+        items = orjson.loads(text)
+    except (KeyError, IndexError, TypeError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Could not parse batched Gemini response: {e}")
+        return suggestions
+
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get("idx")
+        short_fix = item.get("short_fix")
+        detailed_fix = item.get("detailed_fix")
+        if isinstance(idx, int) and 0 <= idx < len(batch) and isinstance(short_fix, str) and isinstance(detailed_fix, str):
+            suggestions[idx] = {"short_fix": short_fix, "detailed_fix": detailed_fix}
+    return suggestions
+
+async def get_ai_suggestions_batch(issues: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Generates suggestions for many issues with as few Gemini calls as possible.
+    Cached issues are answered from memory; the rest are sent AI_BATCH_SIZE at a time in one
+    prompt each (batches run concurrently) instead of one request per issue. An issue missing
+    from a successful batch's answer falls back to get_ai_suggestions; the issues of a batch
+    whose request failed get an error placeholder, so every issue still gets a result.
+
+    Args:
+        issues (List[Dict[str, str]]): One dict per issue with 'description', 'help' and 'html' keys.
+
+    Returns:
+        List[Dict[str, str]]: One suggestion dict ('short_fix', 'detailed_fix') per input issue, in order.
+    """
+    if not _get_api_key():
+        logger.warning("GEMINI_API_KEY environment variable is not set. AI suggestions will not be generated.")
+        return [_API_KEY_MISSING_FALLBACK] * len(issues)
+
+    results: List[Optional[Dict[str, str]]] = [None] * len(issues)
+    # Uncached issues as (position in `issues`, cache key, issue)
+    misses = []
+    for position, issue in enumerate(issues):
+        cache_key = _suggestion_cache_key(issue["description"], issue["help"], issue["html"])
+        cached = _suggestion_cache.get(cache_key)
+        if cached is not None:
+            _suggestion_cache.move_to_end(cache_key)
+            results[position] = dict(cached)
+        else:
+            misses.append((position, cache_key, issue))
+
+    if misses:
+        # Second level: one query for every in-memory miss
+        persisted = await _load_persisted_suggestions([cache_key for _, cache_key, _ in misses])
+        if persisted:
+            for position, cache_key, _ in misses:
+                suggestion = persisted.get(cache_key)
+                if suggestion is not None:
+                    results[position] = dict(suggestion)
+            misses = [miss for miss in misses if miss[1] not in persisted]
+
+    if misses:
+        batches = [misses[start:start + AI_BATCH_SIZE] for start in range(0, len(misses), AI_BATCH_SIZE)]
+        logger.info(f"Requesting AI suggestions for {len(misses)} issues in {len(batches)} batched Gemini call(s).")
+        batch_results = await asyncio.gather(
+            *(_request_suggestion_batch([issue for _, _, issue in batch]) for batch in batches),
+            return_exceptions=True
+        )
+        new_suggestions: Dict[bytes, Dict[str, str]] = {}
+        for batch, suggestions in zip(batches, batch_results):
+            if isinstance(suggestions, BaseException):
+                # _post_gemini already retried (or the error is not retryable, e.g. 401/403), so
+                # re-sending each issue on its own would only multiply the failing requests
+                # against the same quota; every issue of the batch gets the error placeholder.
+                logger.error(f"Batched Gemini request failed: {suggestions}")
+                fallback = _error_fallback(suggestions)
+                for position, _, _ in batch:
+                    results[position] = dict(fallback)
+                continue
+            for idx, (position, cache_key, _) in enumerate(batch):
+                suggestion = suggestions.get(idx)
+                if suggestion is not None:
+                    _cache_suggestion(cache_key, dict(suggestion))
+                    new_suggestions[cache_key] = suggestion
+                    results[position] = suggestion
+        await _persist_suggestions(new_suggestions)
+
+    # Issues a successful batch left out of its answer are requested individually
+    # (with their own error handling)
+    unanswered = [position for position, result in enumerate(results) if result is None]
+    if unanswered:
+        logger.warning(f"{len(unanswered)} issues were not answered by a batch; requesting them individually.")
+        fallbacks = await get_ai_suggestions_many([issues[position] for position in unanswered])
+        for position, suggestion in zip(unanswered, fallbacks):
+            results[position] = suggestion
+
+    return results
 
 # This __main__ block is for local testing of this specific helper file.
 # It will not run when the module is imported by FastAPI.
 if __name__ == "__main__":
-    import asyncio
     import sys
+    from dotenv import load_dotenv
+
+    # Run standalone, nothing has loaded the .env file yet
+    load_dotenv()
 
     # Basic console logging setup for local testing
     logging.basicConfig(level=logging.INFO, stream=sys.stdout,
@@ -198,7 +619,7 @@ if __name__ == "__main__":
         logger.info("--- Testing backend/app/services/ai_helper.py locally ---")
         
         # Ensure GEMINI_API_KEY is set in your .env file or environment for local testing.
-        if not GEMINI_API_KEY:
+        if not _get_api_key():
             logger.error("GEMINI_API_KEY is not set. Please set it in your .env file or as an environment variable.")
             return
 
@@ -229,5 +650,7 @@ if __name__ == "__main__":
         logger.info("AI Suggestions (Test 3):")
         logger.info(json.dumps(suggestions_3, indent=2))
 
+        await close_ai_client()
+
     # Run the local test function
     asyncio.run(test_ai_suggestions_local())
\ No newline at end of file
@@ -1,101 +1,200 @@
+import asyncio
+import gzip
 import logging
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Sequence, Tuple
+from pathlib import Path
 from playwright.async_api import Page
-import os
 
 logger = logging.getLogger("accessibility_analyzer_backend.services.axe_runner")
 
 # --- IMPORTANT: Axe-core JavaScript loading ---
 # This block attempts to load the actual axe.min.js from your project's static directory.
 # Ensure axe.min.js is placed in your 'static/js' folder directly under your 'backend' directory.
+# browser.py registers the script as an init script on every new browser context, so axe is
+# already defined when run_axe_scan runs and the ~550KB source is not sent per scan.
 
-AXE_CORE_SCRIPT_CONTENT = ""
-try:
-    # Construct the absolute path to axe.min.js
-    # This file (axe_runner.py) is in /app/services/
-    # To get to the project root (backend folder), we go up two directories (../../)
-    # Then navigate into static/js/axe.min.js
-    _current_dir = os.path.dirname(os.path.abspath(__file__))
-    _axe_script_path = os.path.join(_current_dir, "..", "..", "static", "js", "axe.min.js")
-
-    if os.path.exists(_axe_script_path):
-        with open(_axe_script_path, "r", encoding="utf-8") as f:
-            AXE_CORE_SCRIPT_CONTENT = f.read()
-        logger.info(f"Loaded axe.min.js from: {_axe_script_path}")
-    else:
-        logger.error(f"axe.min.js not found at expected path: '{_axe_script_path}'. Axe-core scan will likely fail.")
-except Exception as e:
-    logger.error(f"Failed to load axe.min.js from disk: {e}. Axe-core scan will likely fail.")
-
-
-async def run_axe_scan(page: Page) -> List[Dict[str, Any]]:
+# axe.min.js lives in static/js under the backend root (two levels above app/services/).
+# Resolved once at import, like the other backend-root paths in main.py.
+AXE_SCRIPT_PATH = Path(__file__).resolve().parents[2] / "static" / "js" / "axe.min.js"
+
+@lru_cache(maxsize=1)
+def _axe_script_gz() -> bytes:
+    """
+    Returns the gzip-compressed axe-core source, read from disk once per process.
+    Only the compressed bytes (about a fifth of the source) stay resident; get_axe_script()
+    decompresses a short-lived copy when a browser context needs it.
+    Returns b"" (and logs an error) when the file cannot be loaded.
+    """
+    try:
+        # Deployments can embed the compressed script at build time (see write_axe_blob), so
+        # worker boots load it with the module's cached bytecode instead of reading static/.
+        from ._axe_blob import AXE_GZ
+        logger.info("Loaded axe-core from the embedded _axe_blob module.")
+        return AXE_GZ
+    except ImportError:
+        pass
+    try:
+        # A single read; a missing file surfaces as FileNotFoundError instead of a separate exists() check
+        script_bytes = AXE_SCRIPT_PATH.read_bytes()
+        logger.info(f"Loaded axe.min.js from: {AXE_SCRIPT_PATH}")
+        return gzip.compress(script_bytes) if script_bytes else b""
+    except FileNotFoundError:
+        logger.error(f"axe.min.js not found at expected path: '{AXE_SCRIPT_PATH}'. Axe-core scan will likely fail.")
+    except Exception as e:
+        logger.error(f"Failed to load axe.min.js from disk: {e}. Axe-core scan will likely fail.")
+    return b""
+
+def write_axe_blob() -> Path:
+    """
+    Build step: writes app/services/_axe_blob.py holding static/js/axe.min.js as a gzip
+    bytes literal (AXE_GZ), which _axe_script_gz() then prefers over the file. Re-run it
+    whenever axe.min.js is updated. Returns the path of the generated module.
+    """
+    blob_path = Path(__file__).with_name("_axe_blob.py")
+    compressed = gzip.compress(AXE_SCRIPT_PATH.read_bytes())
+    blob_path.write_text(
+        "# Generated by app.services.axe_runner.write_axe_blob() from static/js/axe.min.js; do not edit.\n"
+        f"AXE_GZ = {compressed!r}\n",
+        encoding="utf-8"
+    )
+    return blob_path
+
+async def load_axe_script() -> None:
+    """
+    Reads (and compresses) axe.min.js in a worker thread, so the blocking file read happens
+    during application startup instead of on the event loop when the first context needs it.
+    """
+    await asyncio.to_thread(_axe_script_gz)
+
+def axe_script_available() -> bool:
+    """True when axe.min.js was loaded, without decompressing it."""
+    return bool(_axe_script_gz())
+
+def get_axe_script() -> str:
+    """
+    Returns the axe-core source, or an empty string when it could not be loaded.
+    Decompressed on each call, so callers should not hold on to the result.
+    """
+    script_gz = _axe_script_gz()
+    return gzip.decompress(script_gz).decode("utf-8") if script_gz else ""
+
+
+# Rule tags scanned by default: WCAG 2.0 level A and AA. Experimental and best-practice rules are skipped.
+AXE_DEFAULT_TAGS: Tuple[str, ...] = ("wcag2a", "wcag2aa")
+
+# Violations returned per page.evaluate call. Large result sets are left on the page and
+# fetched in slices of this size, so no single round trip has to serialize (and Python has
+# to parse) megabytes of JSON at once.
+AXE_RESULT_CHUNK_SIZE = 50
+
+# Defines window.__runAxe, which runs the scan within the browser context. Registered next to
+# axe-core as a context init script (see browser.py), so each page compiles it once and a scan
+# only sends the short _AXE_SCAN_JS call across the bridge.
+# The violations are projected to the fields we store before leaving the page, so only
+# that subset is serialized across the Playwright bridge instead of the full axe result
+# (which repeats check data, related nodes and messages for every node).
+# Returns {count, issues} with the first chunk of issues; when there are more, the full list
+# stays on window.__axeIssues for _AXE_CHUNK_JS to slice.
+AXE_RUNNER_SCRIPT = """
+    window.__runAxe = async ({ tags, chunkSize }) => {
+        // Only the rules with the requested tags are run, and only violations are collected:
+        // axe skips building node details for passes/incomplete/inapplicable results.
+        // Frames are not scanned: axe is only loaded into the top document (see
+        // get_axe_init_script), so pinging frames for results would only wait on them.
+        const results = await axe.run(document, {
+            runOnly: { type: 'tag', values: tags },
+            resultTypes: ['violations'],
+            iframes: false
+        });
+        // Shaped like our Issue schema, so Python can use the result as-is.
+        // axe groups every failing node under its rule, so one issue covers all of them
+        // (AI suggestions are requested once per issue, never once per node).
+        const issues = results.violations.map(v => ({
+            id: v.id,
+            description: v.description,
+            help: v.help,
+            helpUrl: v.helpUrl,
+            severity: v.impact ?? 'minor', // axe uses 'impact' (critical, serious, moderate, minor)
+            tags: v.tags,
+            nodes: v.nodes.map(n => ({ html: n.html, target: n.target, failureSummary: n.failureSummary })),
+            node_count: v.nodes.length
+        }));
+        if (issues.length > chunkSize) {
+            window.__axeIssues = issues;
+        }
+        return { count: issues.length, issues: issues.slice(0, chunkSize) };
+    };
+"""
+def get_axe_init_script() -> str:
     """
-    Runs an axe-core accessibility scan on the current Playwright page.
-    Injects axe-core and then executes the scan.
+    Returns axe-core plus the scan function as one context init script, or "" when axe-core
+    could not be loaded. Init scripts run in every frame of a page, so both are guarded to run in
+    the top document only: ad, embed and tracker iframes neither parse the ~550KB of axe-core nor
+    contribute violations, matching the scope of run_axe_scan's main-frame injection.
+    Decompressed on each call, like get_axe_script.
+    """
+    axe_script = get_axe_script()
+    if not axe_script:
+        return ""
+    # The newlines keep axe's trailing line comment (if any) from swallowing the closing brace
+    return f"if (window === window.top) {{\n{axe_script}\n{AXE_RUNNER_SCRIPT}\n}}"
+
+# null tells Python that axe (or the runner) is not on the page yet and must be injected first
+_AXE_SCAN_JS = "(options) => typeof window.axe === 'undefined' || typeof window.__runAxe !== 'function' ? null : window.__runAxe(options)"
+_AXE_CHUNK_JS = "([start, size]) => window.__axeIssues.slice(start, start + size)"
+_AXE_CHUNK_CLEANUP_JS = "() => { delete window.__axeIssues; }"
+
+
+async def run_axe_scan(page: Page, tags: Sequence[str] = AXE_DEFAULT_TAGS) -> List[Dict[str, Any]]:
+    """
+    Runs an axe-core accessibility scan on the current Playwright page, limited to the rules
+    carrying one of `tags` (axe rule tags such as 'wcag2a', 'wcag21aa' or 'best-practice').
+    Runs the scan with the preloaded axe-core, injecting it first only when the page lacks it.
     Returns a list of accessibility violations.
     """
-    if not AXE_CORE_SCRIPT_CONTENT:
-        logger.error("AXE_CORE_SCRIPT_CONTENT is empty. Axe-core cannot be injected or run. Returning empty results.")
+    if not axe_script_available():
+        logger.error("The axe-core script is empty. Axe-core cannot be injected or run. Returning empty results.")
         return [] # Return empty list if axe script is not loaded
 
     try:
-        # Inject axe-core into the page context
-        await page.add_script_tag(content=AXE_CORE_SCRIPT_CONTENT)
-        logger.info("Axe-core script injected into the page.")
-
-        # Run the axe-core scan within the browser context
-        results = await page.evaluate("""
-            async () => {
-                // Ensure axe is defined before running
-                if (typeof axe === 'undefined') {
-                    console.error("axe is not defined on the page. Script injection might have failed.");
-                    return null; // Explicitly return null if axe is not found
-                }
-                const results = await axe.run(document);
-                return results;
-            }
-        """)
+        # Pages from get_browser_context_and_page already have axe from the context's init script,
+        # so the scan usually runs in a single evaluate call. Only pages created some other way
+        # get null back, have the script injected, and are scanned again.
+        scan_args = {"tags": list(tags), "chunkSize": AXE_RESULT_CHUNK_SIZE} # Passed to the page as the script's argument
+        scan_result = await page.evaluate(_AXE_SCAN_JS, scan_args)
+        if scan_result is None:
+            await page.add_script_tag(content=get_axe_script())
+            await page.add_script_tag(content=AXE_RUNNER_SCRIPT)
+            logger.info("Axe-core was not preloaded; script injected into the page.")
+            scan_result = await page.evaluate(_AXE_SCAN_JS, scan_args)
 
         # --- IMPORTANT: Handle potential NoneType from page.evaluate ---
-        if results is None:
+        if scan_result is None:
             logger.error("page.evaluate('axe.run()') returned None. Axe-core did not produce results. This often means axe.js wasn't loaded correctly or there was a JS error in axe.run().")
             return [] # Return an empty list to avoid AttributeError
 
-        violations = results.get('violations', [])
+        violations = scan_result["issues"]
+        total = scan_result["count"]
+        if total > len(violations):
+            # Fetch the remaining violations a slice at a time, then drop them from the page
+            try:
+                for start in range(len(violations), total, AXE_RESULT_CHUNK_SIZE):
+                    violations.extend(await page.evaluate(_AXE_CHUNK_JS, [start, AXE_RESULT_CHUNK_SIZE]))
+            finally:
+                await page.evaluate(_AXE_CHUNK_CLEANUP_JS)
+
         logger.info(f"Axe-core scan completed. Found {len(violations)} raw violations.")
 
-        # Format violations to match your Issue schema
-        formatted_issues = []
-        for violation in violations:
-            nodes_data = []
-            for node in violation.get('nodes', []):
-                nodes_data.append({
-                    "html": node.get('html'),
-                    "target": node.get('target', []),
-                    "snippet": node.get('snippet'),
-                    "failureSummary": node.get('failureSummary'),
-                    "xpath": node.get('xpath') # axe-core provides xpath in nodes
-                })
-
-            formatted_issues.append({
-                "id": violation.get('id', 'unknown'),
-                "description": violation.get('description', 'No description'),
-                "help": violation.get('help', 'No help message'),
-                "helpUrl": violation.get('helpUrl'),
-                "severity": violation.get('impact', 'minor'), # axe uses 'impact' (critical, serious, moderate, minor)
-                "tags": violation.get('tags', []),
-                "nodes": nodes_data,
-                # "ai_suggestions": None # Will be populated later in analyzer.py
-            })
-        return formatted_issues
+        # Already projected into issue dicts in the page; Playwright's deserialized result is returned without another copy
+        return violations
     except Exception as e:
         logger.error(f"Error running Axe-core scan with Playwright: {e}", exc_info=True)
         raise # Re-raise the exception after logging for upstream handling
 
 if __name__ == "__main__":
-    import asyncio
-    # Ensure these imports are correct relative to your project structure if you use this test block
-    from accessibility_analyzer_backend.services.browser import get_browser_context_and_page, close_browser_context, close_playwright_browser_instances
+    # Run from the backend root with `python -m app.services.axe_runner`
+    from app.services.browser import get_browser_context_and_page, close_browser_context, close_playwright_browser_instances
 
     async def test_axe_scan():
         context, page = None, None
@@ -119,7 +218,7 @@ if __name__ == "__main__":
             traceback.print_exc() # Print full traceback for debug
         finally:
             if context:
-                await close_browser_context(context)
+                await close_browser_context(context, page)
             await close_playwright_browser_instances() # Ensure Playwright is stopped
 
     asyncio.run(test_axe_scan())
\ No newline at end of file
@@ -1,82 +1,644 @@
+import asyncio
+import json
 import logging
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext # Import necessary Playwright classes
-from typing import Literal, Tuple, Dict, Any
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route # Import necessary Playwright classes
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from functools import lru_cache
+from typing import AbstractSet, AsyncIterator, Awaitable, Callable, FrozenSet, Literal, List, Optional, Set, Tuple, Dict, Any
+from .axe_runner import axe_script_available, get_axe_init_script, load_axe_script
 
 logger = logging.getLogger("accessibility_analyzer_backend.services.browser")
 
+BrowserType = Literal["chromium", "firefox", "webkit"]
+
 # Global Playwright instance to manage browsers
 _playwright_instance = None
-_browser_cache: Dict[str, Browser] = {}
+# Serializes starting Playwright, so concurrent first launches share one driver process.
+# Browser launches are serialized per browser type by each BrowserPool's own lock (and the
+# persistent context by _persistent_lock), so warming Firefox never waits on a Chromium launch.
+_playwright_lock = asyncio.Lock()
 
-async def get_browser_context_and_page(
-    browser_type: Literal["chromium", "firefox", "webkit"] = "chromium"
-) -> Tuple[BrowserContext, Page]:
+# Long-lived browser processes serve every analysis; each analysis gets its own context
+# (cheap, isolated cookies/storage) instead of its own browser. BROWSER_POOL_SIZE browsers of a
+# type are launched at startup and contexts are spread over them round-robin, so concurrent
+# analyses do not all share (and crash together with) a single browser process.
+BROWSER_POOL_SIZE = max(1, int(os.getenv("BROWSER_POOL_SIZE", "1")))
+# Long-lived browsers grow with every navigation (caches, leaked renderer memory) and a wedged
+# one can stay "connected", so each pooled browser is replaced after serving BROWSER_MAX_USES
+# contexts or living BROWSER_MAX_AGE_SECONDS. The old browser keeps running until the analyses
+# still using it finish (at most BROWSER_RETIRE_TIMEOUT_SECONDS), then it is closed.
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "1000"))
+BROWSER_MAX_AGE_SECONDS = float(os.getenv("BROWSER_MAX_AGE_SECONDS", "1800"))
+BROWSER_RETIRE_TIMEOUT_SECONDS = 300.0
+# The number of open contexts is
+# capped so a burst of requests queues here rather than exhausting the browser's memory.
+MAX_BROWSER_CONTEXTS = int(os.getenv("MAX_BROWSER_CONTEXTS", "8"))
+_context_slots = asyncio.Semaphore(MAX_BROWSER_CONTEXTS)
+# Contexts holding a slot, released again by close_browser_context
+_open_contexts: Set[BrowserContext] = set()
+
+# Optional remote browsers: with PLAYWRIGHT_WS_ENDPOINT set (e.g. ws://browsers:3000/ for a
+# `playwright run-server --port 3000` sidecar), the pool's browsers are launched by that server
+# and connected to over WebSocket instead of being spawned by every worker process, so several
+# uvicorn workers (or replicas) share one browser host and a browser crash cannot take a worker
+# down with it. The server must run the same Playwright version as requirements.txt.
+# The persistent context (PERSISTENT_CONTEXT_DIR) is always launched locally.
+PLAYWRIGHT_WS_ENDPOINT = os.getenv("PLAYWRIGHT_WS_ENDPOINT")
+
+# Optional context reuse (BROWSER_REUSE_CONTEXTS=1): instead of being closed, an analysis'
+# context has its pages closed and its cookies and permissions cleared, then waits in an idle
+# queue for the next analysis of the same browser type. This skips context creation and the
+# axe preload per scan, but localStorage, IndexedDB and the HTTP cache carry over between
+# analyses, so the default (unset) keeps one fresh context per analysis.
+REUSE_CONTEXTS = os.getenv("BROWSER_REUSE_CONTEXTS", "").lower() in ("1", "true", "yes")
+_idle_contexts: Dict[str, "asyncio.Queue[BrowserContext]"] = {}
+# Browser type of every reusable context, so close_browser_context knows which queue it returns to
+_reusable_contexts: Dict[BrowserContext, str] = {}
+
+# Optional persistent mode for repeat scans of the same sites (e.g. CI): with
+# BROWSER_PERSISTENT_CONTEXT_DIR set, Chromium analyses get a page in one persistent context
+# whose HTTP cache lives in that directory, so DNS, TLS sessions and cached CDN assets carry
+# over between scans and restarts. Cookies are cleared whenever the context has no open pages.
+# Analyses running at the same time share cookies and storage in this mode, so the default
+# (unset) keeps one fresh, isolated context per analysis.
+PERSISTENT_CONTEXT_DIR = os.getenv("BROWSER_PERSISTENT_CONTEXT_DIR")
+_persistent_context: Optional[BrowserContext] = None
+_persistent_lock = asyncio.Lock()
+# Pages of the persistent context holding a slot, released again by close_browser_context
+_open_persistent_pages: Set[Page] = set()
+
+# Chromium flags for a long-lived headless scanning browser: besides the container basics
+# (no sandbox, no /dev/shm, no GPU), turn off background services, extensions and features an
+# analysis never uses, so each context needs less memory and the idle browser wakes up less.
+# BROWSER_LOW_MEMORY=1 runs Chromium in a single process, which saves the most RAM on small
+# hosts but is less robust (a crashing page takes the whole browser down).
+BROWSER_LOW_MEMORY = os.getenv("BROWSER_LOW_MEMORY", "").lower() in ("1", "true", "yes")
+CHROMIUM_ARGS: Tuple[str, ...] = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-features=TranslateUI,BackForwardCache,AcceptCHFrame,MediaRouter,OptimizationHints",
+    "--disable-hang-monitor",
+    "--disable-ipc-flooding-protection",
+    "--disable-renderer-backgrounding",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    "--password-store=basic",
+    "--use-mock-keychain",
+    "--single-process" if BROWSER_LOW_MEMORY else "--process-per-site",
+)
+FIREFOX_ARGS: Tuple[str, ...] = ("--no-sandbox",)
+WEBKIT_ARGS: Tuple[str, ...] = ("--no-sandbox",)
+# Desktop viewport of every analysis context. Like the argument tuples above it is built once at
+# import and passed to Playwright as is (launch args accept any sequence), not rebuilt per call.
+# 1280x800 is above the common desktop breakpoints (1024/1200px), so pages render their desktop
+# layout, while laying out and painting about half the pixels of 1920x1080. Override it with
+# BROWSER_VIEWPORT_WIDTH / BROWSER_VIEWPORT_HEIGHT for sites that only switch at wider breakpoints.
+VIEWPORT: Dict[str, int] = {
+    "width": int(os.getenv("BROWSER_VIEWPORT_WIDTH", "1280")),
+    "height": int(os.getenv("BROWSER_VIEWPORT_HEIGHT", "800")),
+}
+# Launch arguments per supported browser type; also the list of types get_browser_context_and_page accepts
+_LAUNCH_ARGS: Dict[str, Tuple[str, ...]] = {
+    "chromium": CHROMIUM_ARGS,
+    "firefox": FIREFOX_ARGS,
+    "webkit": WEBKIT_ARGS,
+}
+
+# Resource types aborted while loading a page for analysis. Axe and the custom rules read the DOM,
+# ARIA and computed styles, never image pixels, font files or media streams, so skipping these
+# downloads shortens navigation without changing the results.
+# Stylesheets are deliberately not in the default: axe's color-contrast and several other rules
+# read computed styles, so callers that only need the DOM can add "stylesheet" via skip_resources.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+RouteHandler = Callable[[Route], Awaitable[None]]
+
+@lru_cache(maxsize=None)
+def _resource_blocker(resource_types: FrozenSet[str]) -> RouteHandler:
     """
-    Launches a browser (Chromium, Firefox, or WebKit) and returns a new
-    browser context and page. This function now handles the Playwright lifecycle.
+    Returns a route handler that aborts requests for the given resource types and lets
+    everything else through. Cached, so each distinct set of types shares one handler.
     """
+    async def block_resources(route: Route) -> None:
+        if route.request.resource_type in resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+    return block_resources
+
+_block_heavy_resources = _resource_blocker(BLOCKED_RESOURCE_TYPES)
+
+async def _get_playwright():
+    """Returns the shared Playwright instance, starting it on first use."""
     global _playwright_instance
-    global _browser_cache
 
     if _playwright_instance is None:
-        _playwright_instance = await async_playwright().start()
+        async with _playwright_lock:
+            # Another launch may have started it while we waited for the lock
+            if _playwright_instance is None:
+                _playwright_instance = await async_playwright().start()
+    return _playwright_instance
 
-    browser = _browser_cache.get(browser_type)
-    if not browser or not browser.is_connected():
-        logger.info(f"Launching new Playwright {browser_type} browser...")
+async def _launch_browser(browser_type: BrowserType) -> Browser:
+    """
+    Launches one headless browser of the given type (or connects to one started by the
+    PLAYWRIGHT_WS_ENDPOINT server), starting Playwright if needed.
+    Callers hold the browser type's pool lock.
+    """
+    launch_args = _LAUNCH_ARGS.get(browser_type)
+    if launch_args is None:
+        raise ValueError("Unsupported browser type. Choose 'chromium', 'firefox', or 'webkit'.")
+
+    playwright = await _get_playwright()
+
+    logger.info(f"Launching new Playwright {browser_type} browser...")
+    try:
+        # The Playwright instance exposes one launcher per engine under the same name
+        # (playwright.chromium, playwright.firefox, playwright.webkit)
+        launcher = getattr(playwright, browser_type)
+        if PLAYWRIGHT_WS_ENDPOINT:
+            # The run-server reads the launch options for the browser it starts from this header
+            browser = await launcher.connect(
+                PLAYWRIGHT_WS_ENDPOINT,
+                headers={"x-playwright-launch-options": json.dumps({"headless": True, "args": list(launch_args)})}
+            )
+        else:
+            browser = await launcher.launch(headless=True, args=launch_args)
+        logger.info(f"Playwright {browser_type} browser launched successfully.")
+    except Exception as e:
+        logger.error(f"Error launching Playwright {browser_type} browser: {e}")
+        raise
+    return browser
+
+@dataclass
+class BrowserEntry:
+    """A pooled browser and the bookkeeping that decides when it is recycled."""
+    browser: Browser
+    created_at: float = field(default_factory=time.monotonic)
+    uses: int = 0 # Contexts created on this browser
+    max_uses: int = BROWSER_MAX_USES
+    max_age_s: float = BROWSER_MAX_AGE_SECONDS
+
+    def is_expired(self) -> bool:
+        """True once the browser has served max_uses contexts or is older than max_age_s."""
+        return self.uses >= self.max_uses or time.monotonic() - self.created_at > self.max_age_s
+
+class BrowserPool:
+    """
+    A fixed number of launched browsers of one type, kept in an asyncio.Queue.
+    acquire() checks a browser out only while a context is created on it and then puts it back
+    at the end of the queue, so successive analyses are spread round-robin over the browsers
+    (the number of open contexts is still capped by MAX_BROWSER_CONTEXTS, not by the pool size).
+    A browser that crashed or disconnected is relaunched when it is next checked out, and one
+    past its use or age limit (see BrowserEntry) is replaced and retired.
+    """
+
+    def __init__(self, browser_type: BrowserType, size: int):
+        self.browser_type = browser_type
+        self.size = size
+        self.entries: List[BrowserEntry] = []
+        self._queue: "asyncio.Queue[BrowserEntry]" = asyncio.Queue()
+        # Serializes this type's launches, so concurrent first requests share the pool's
+        # browsers instead of each starting their own (and all but one leaking)
+        self._lock = asyncio.Lock()
+        # Replaced browsers waiting for their last analyses before closing
+        self._retiring: Set["asyncio.Task[None]"] = set()
+
+    async def warm(self) -> None:
+        """Launches browsers until the pool holds `size` of them."""
+        async with self._lock:
+            while len(self.entries) < self.size:
+                entry = BrowserEntry(await _launch_browser(self.browser_type))
+                self.entries.append(entry)
+                self._queue.put_nowait(entry)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Browser]:
+        """Checks out the next browser of the pool, launching the pool first if it is not full."""
+        if len(self.entries) < self.size:
+            try:
+                await self.warm()
+            except Exception:
+                if not self.entries:
+                    raise
+                # Serve the analysis with the browsers that did launch; the next call retries
+                logger.warning(f"{self.browser_type} browser pool is running with {len(self.entries)} of {self.size} browsers.")
+        entry = await self._queue.get()
         try:
-            if browser_type == "chromium":
-                browser = await _playwright_instance.chromium.launch(headless=True, args=[
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                ])
-            elif browser_type == "firefox":
-                browser = await _playwright_instance.firefox.launch(headless=True, args=[
-                    "--no-sandbox",
-                ])
-            elif browser_type == "webkit":
-                browser = await _playwright_instance.webkit.launch(headless=True, args=[
-                    "--no-sandbox",
-                ])
-            else:
-                raise ValueError("Unsupported browser type. Choose 'chromium', 'firefox', or 'webkit'.")
-            _browser_cache[browser_type] = browser
-            logger.info(f"Playwright {browser_type} browser launched successfully.")
-        except Exception as e:
-            logger.error(f"Error launching Playwright {browser_type} browser: {e}")
+            if not entry.browser.is_connected() or entry.is_expired():
+                entry = await self._replace(entry)
+            entry.uses += 1
+            yield entry.browser
+        finally:
+            self._queue.put_nowait(entry)
+
+    def entry_for(self, browser: Browser) -> Optional[BrowserEntry]:
+        """Returns the pool's entry for `browser`, or None once it was replaced (or never pooled)."""
+        for entry in self.entries:
+            if entry.browser is browser:
+                return entry
+        return None
+
+    async def _replace(self, old: BrowserEntry) -> BrowserEntry:
+        """
+        Replaces a disconnected or expired browser of the pool with a newly launched one.
+        A still-connected old browser is retired in the background; if the replacement cannot
+        be launched, it keeps serving until the next checkout retries.
+        """
+        connected = old.browser.is_connected()
+        if connected:
+            logger.info(f"Recycling pooled Playwright {self.browser_type} browser after {old.uses} contexts.")
+        else:
+            logger.warning(f"Pooled Playwright {self.browser_type} browser is disconnected; relaunching it.")
+        try:
+            async with self._lock:
+                entry = BrowserEntry(await _launch_browser(self.browser_type))
+        except Exception:
+            if connected:
+                return old
+            raise
+        self.entries[self.entries.index(old)] = entry
+        if connected:
+            # Idle reusable contexts on the old browser must not be handed out again; the ones
+            # still in use are closed instead of kept when released (see _release_reused_context)
+            await _evict_idle_contexts(self.browser_type, old.browser)
+            task = asyncio.create_task(self._retire(old.browser))
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+        return entry
+
+    async def _retire(self, browser: Browser) -> None:
+        """Closes a replaced browser once none of its contexts is in use by an analysis."""
+        deadline = time.monotonic() + BROWSER_RETIRE_TIMEOUT_SECONDS
+        try:
+            while time.monotonic() < deadline and any(c in _open_contexts for c in browser.contexts):
+                await asyncio.sleep(1.0)
+        finally:
+            # Also on cancellation (pool shutdown): close instead of waiting any longer
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing retired Playwright {self.browser_type} browser: {e}")
+
+    async def close(self) -> None:
+        """Closes every browser of the pool, including ones still being retired."""
+        retiring = list(self._retiring)
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, return_exceptions=True)
+        for entry in self.entries:
+            if entry.browser.is_connected():
+                await entry.browser.close()
+        self.entries.clear()
+        self._queue = asyncio.Queue()
+
+# One pool per browser type, created on first use
+_browser_pools: Dict[str, BrowserPool] = {}
+
+def _get_pool(browser_type: BrowserType) -> BrowserPool:
+    """Returns the browser pool for the given type, creating it (without launching) if needed."""
+    pool = _browser_pools.get(browser_type)
+    if pool is None:
+        if browser_type not in _LAUNCH_ARGS:
+            raise ValueError("Unsupported browser type. Choose 'chromium', 'firefox', or 'webkit'.")
+        pool = _browser_pools[browser_type] = BrowserPool(browser_type, BROWSER_POOL_SIZE)
+    return pool
+
+async def warm_pool(browser_type: BrowserType, size: int = BROWSER_POOL_SIZE) -> None:
+    """Launches `size` browsers of the given type into its pool ahead of the first analysis."""
+    pool = _get_pool(browser_type)
+    pool.size = max(pool.size, size)
+    await pool.warm()
+
+async def _prepare_context(context: BrowserContext) -> None:
+    """
+    Preloads axe-core and the scan function into the top document of every page of the context:
+    the script is sent to the browser once per context instead of being injected by run_axe_scan
+    on each scan. Child frames do not get it (see get_axe_init_script).
+    """
+    if axe_script_available():
+        await context.add_init_script(script=get_axe_init_script())
+
+async def get_persistent_context() -> BrowserContext:
+    """
+    Returns the persistent Chromium context stored in PERSISTENT_CONTEXT_DIR, launching it
+    (and starting Playwright) on first use.
+    """
+    global _persistent_context
+
+    if _persistent_context is not None:
+        return _persistent_context
+
+    async with _persistent_lock:
+        if _persistent_context is None:
+            playwright = await _get_playwright()
+            logger.info(f"Launching persistent Playwright chromium context in '{PERSISTENT_CONTEXT_DIR}'...")
+            context = await playwright.chromium.launch_persistent_context(
+                PERSISTENT_CONTEXT_DIR,
+                headless=True,
+                args=CHROMIUM_ARGS,
+                viewport=VIEWPORT
+            )
+            await _prepare_context(context)
+            # A persistent context opens with a blank page; analyses open their own
+            for blank_page in context.pages:
+                await blank_page.close()
+            _persistent_context = context
+    return _persistent_context
+
+async def start_browser(browser_type: BrowserType = "chromium") -> None:
+    """
+    Launches the browser pool ahead of the first analysis (called from the app's startup),
+    then opens and closes one analysis context and page, so the first request also skips the
+    first context's setup (the axe preload, the first renderer) and, with REUSE_CONTEXTS,
+    finds an idle context ready. A failure is only logged; the launch is retried on the first request.
+    """
+    try:
+        if PERSISTENT_CONTEXT_DIR and browser_type == "chromium":
+            await get_persistent_context()
+        else:
+            await warm_pool(browser_type)
+    except Exception as e:
+        logger.warning(f"Could not launch the Playwright {browser_type} browser at startup: {e}")
+        return
+    try:
+        # The warm-up context preloads axe; read it in a thread rather than on the event loop
+        await load_axe_script()
+        context, page = await get_browser_context_and_page(browser_type)
+        await close_browser_context(context, page)
+        logger.info(f"Playwright {browser_type} browser warmed up.")
+    except Exception as e:
+        logger.warning(f"Could not warm up the Playwright {browser_type} browser at startup: {e}")
+
+async def get_browser_context_and_page(
+    browser_type: BrowserType = "chromium",
+    block_resources: bool = True,
+    skip_resources: AbstractSet[str] = BLOCKED_RESOURCE_TYPES
+) -> Tuple[BrowserContext, Page]:
+    """
+    Returns a new browser context and page on the next pooled browser of the given type
+    (Chromium, Firefox, or WebKit), launching the pool if needed. Waits while
+    MAX_BROWSER_CONTEXTS contexts are already open; pass the context and page to
+    close_browser_context when done to free the slot.
+    With `block_resources`, requests of the resource types in `skip_resources` (by default images,
+    media and fonts, see BLOCKED_RESOURCE_TYPES) are not downloaded.
+    In persistent mode (PERSISTENT_CONTEXT_DIR) Chromium pages share the persistent context instead.
+    """
+    blocker = _resource_blocker(frozenset(skip_resources)) if block_resources and skip_resources else None
+    await _context_slots.acquire()
+    if PERSISTENT_CONTEXT_DIR and browser_type == "chromium":
+        try:
+            context = await get_persistent_context()
+            if not context.pages:
+                await context.clear_cookies() # Idle: nothing carries over to the next analysis
+            page = await context.new_page()
+        except BaseException:
+            _context_slots.release()
             raise
+        _open_persistent_pages.add(page)
+        try:
+            if blocker is not None:
+                await page.route("**/*", blocker)
+        except BaseException:
+            await close_browser_context(context, page)
+            raise
+        logger.info("New page created in the persistent browser context.")
+        return context, page
+
+    if REUSE_CONTEXTS:
+        return await _get_reused_context_and_page(browser_type, blocker)
 
-    # Create a new isolated browser context for each analysis
-    # This ensures a clean state (no shared cookies, local storage, etc.)
-    context = await browser.new_context(viewport={"width": 1920, "height": 1080})
-    page = await context.new_page()
+    try:
+        async with _get_pool(browser_type).acquire() as browser:
+            # Create a new isolated browser context for each analysis
+            # This ensures a clean state (no shared cookies, local storage, etc.)
+            context = await browser.new_context(viewport=VIEWPORT)
+    except BaseException:
+        _context_slots.release()
+        raise
+    _open_contexts.add(context)
+    try:
+        await _prepare_context(context)
+        if blocker is not None:
+            await context.route("**/*", blocker)
+        page = await context.new_page()
+    except BaseException:
+        await close_browser_context(context)
+        raise
 
     logger.info("New browser context and page created.")
     return context, page
 
-async def close_browser_context(context: BrowserContext):
+async def _get_reused_context_and_page(
+    browser_type: BrowserType,
+    blocker: Optional[RouteHandler]
+) -> Tuple[BrowserContext, Page]:
     """
-    Closes the given Playwright browser context.
+    Context-reuse variant of get_browser_context_and_page (see REUSE_CONTEXTS): takes an idle
+    context of the browser type, or creates one if none is left, and returns it with the blank
+    page kept from its previous analysis (a new page only the first time), so a warm scan starts
+    neither a context nor a renderer for its page. Resource blocking (`blocker`) is routed per
+    page, since the same page may next serve a call that blocks other types or none.
+    Called holding a context slot.
     """
+    idle = _idle_contexts.setdefault(browser_type, asyncio.Queue())
+    pool = _get_pool(browser_type)
+    try:
+        context = None
+        while context is None and not idle.empty():
+            candidate = idle.get_nowait()
+            # Reuse counts towards the browser's recycling limits like a new context does. An
+            # expired browser's contexts are dropped, so the next pool checkout replaces it; a
+            # retired or disconnected browser has no entry any more.
+            entry = pool.entry_for(candidate.browser) if candidate.browser is not None else None
+            if entry is not None and candidate.browser.is_connected() and not entry.is_expired():
+                entry.uses += 1
+                context = candidate
+            else:
+                await _discard_reusable_context(candidate)
+        if context is None:
+            async with pool.acquire() as browser:
+                context = await browser.new_context(viewport=VIEWPORT)
+            try:
+                await _prepare_context(context)
+            except BaseException:
+                await context.close()
+                raise
+            _reusable_contexts[context] = browser_type
+    except BaseException:
+        _context_slots.release()
+        raise
+    _open_contexts.add(context)
+    page = None
+    try:
+        page = context.pages[0] if context.pages else await context.new_page()
+        if blocker is not None:
+            await page.route("**/*", blocker)
+    except BaseException:
+        await close_browser_context(context, page)
+        raise
+
+    logger.info("Reused browser context and page prepared.")
+    return context, page
+
+async def _release_reused_context(context: BrowserContext) -> None:
+    """
+    Resets a reusable context and puts it back in its idle queue: its first page is navigated to
+    about:blank (dropping the analyzed document, its scripts and window state) and kept for the
+    next analysis, any other pages are closed, and cookies and permissions are cleared.
+    A context that cannot be reset, or whose browser was retired or has expired in the
+    meantime, is closed and dropped instead.
+    """
+    browser_type = _reusable_contexts[context]
+    entry = _get_pool(browser_type).entry_for(context.browser) if context.browser is not None else None
+    if entry is None or entry.is_expired():
+        await _discard_reusable_context(context)
+        return
+    try:
+        kept_page, *extra_pages = context.pages or [None]
+        for open_page in extra_pages:
+            await open_page.close()
+        if kept_page is not None:
+            await kept_page.unroute("**/*")
+            await kept_page.goto("about:blank")
+        await context.clear_cookies()
+        await context.clear_permissions()
+    except Exception as e:
+        logger.warning(f"Could not reset browser context for reuse, closing it: {e}")
+        await _discard_reusable_context(context)
+        return
+    _idle_contexts.setdefault(browser_type, asyncio.Queue()).put_nowait(context)
+
+async def _discard_reusable_context(context: BrowserContext) -> None:
+    """Forgets a reusable context and closes it (a no-op for one whose browser is already gone)."""
+    _reusable_contexts.pop(context, None)
+    try:
+        await context.close()
+    except Exception:
+        pass
+
+async def _evict_idle_contexts(browser_type: BrowserType, browser: Browser) -> None:
+    """Removes the idle reusable contexts of `browser` from the browser type's queue and closes them."""
+    idle = _idle_contexts.get(browser_type)
+    if idle is None:
+        return
+    kept: List[BrowserContext] = []
+    evicted: List[BrowserContext] = []
+    while not idle.empty():
+        context = idle.get_nowait()
+        (evicted if context.browser is browser else kept).append(context)
+    for context in kept:
+        idle.put_nowait(context)
+    for context in evicted:
+        await _discard_reusable_context(context)
+
+# A page counts as parsed once readyState leaves 'loading'. Parser-blocking (synchronous) scripts
+# have all run by then, since they hold the parser; what this skips, compared with
+# wait_until="domcontentloaded", is the deferred and type="module" scripts, which run between
+# 'interactive' and DOMContentLoaded. Server-rendered pages are complete at that point, but those
+# scripts are exactly where SPA bundles render, so an app shell would be scanned empty.
+_PAGE_PARSED_JS = "() => document.readyState !== 'loading' && !!document.body"
+# An app shell: a body with nothing but empty mount nodes (<div id="root">, <app-root>, ...)
+# and scripts/styles. Such pages also wait for DOMContentLoaded and then for the app to render.
+_APP_SHELL_JS = """() => Array.from(document.body.children).every(el =>
+    ['SCRIPT', 'NOSCRIPT', 'TEMPLATE', 'STYLE', 'LINK'].includes(el.tagName)
+    || ((el.tagName === 'DIV' || el.tagName === 'MAIN' || el.tagName.includes('-'))
+        && el.childElementCount === 0 && !el.textContent.trim()))"""
+_APP_RENDERED_JS = f"() => !({_APP_SHELL_JS})()"
+# Shared by all readiness steps of one navigation
+PAGE_READY_TIMEOUT_MS = 15000
+
+async def goto_for_analysis(page: Page, url: str, timeout: int = 120000) -> None:
+    """
+    Navigates `page` to `url`, returning as soon as the response is committed and the HTML is
+    parsed (see _PAGE_PARSED_JS). An app shell (_APP_SHELL_JS) additionally waits for
+    DOMContentLoaded, so its deferred/module bundle has run, and then for the body to get
+    content. A page that is not ready within PAGE_READY_TIMEOUT_MS (e.g. an empty body, or an
+    app still fetching its data) is analyzed as it is.
+    """
+    await page.goto(url, wait_until="commit", timeout=timeout)
+    deadline = time.monotonic() + PAGE_READY_TIMEOUT_MS / 1000
+
+    def remaining_ms() -> float:
+        return max(1.0, (deadline - time.monotonic()) * 1000)
+
+    try:
+        await page.wait_for_function(_PAGE_PARSED_JS, timeout=remaining_ms())
+        if await page.evaluate(_APP_SHELL_JS):
+            await page.wait_for_load_state("domcontentloaded", timeout=remaining_ms())
+            await page.wait_for_function(_APP_RENDERED_JS, timeout=remaining_ms())
+    except PlaywrightTimeoutError:
+        logger.warning(f"Page readiness check timed out for URL: {url}; analyzing the page as loaded so far.")
+    except PlaywrightError as e:
+        # e.g. a client-side redirect destroyed the context the check was running in
+        logger.warning(f"Page readiness check failed for URL: {url}; analyzing the page as loaded so far. Error: {e}")
+
+async def close_browser_context(context: BrowserContext, page: Optional[Page] = None):
+    """
+    Closes the given Playwright browser context and frees its context slot.
+    For the shared persistent context only `page` is closed; the context stays open.
+    A reusable context (REUSE_CONTEXTS) is reset and kept for the next analysis instead.
+    """
+    if context is not None and context is _persistent_context:
+        if page is not None:
+            try:
+                await page.close()
+            finally:
+                if page in _open_persistent_pages:
+                    _open_persistent_pages.discard(page)
+                    _context_slots.release()
+        return
+    if context is not None and context in _reusable_contexts:
+        try:
+            await _release_reused_context(context)
+        finally:
+            if context in _open_contexts:
+                _open_contexts.discard(context)
+                _context_slots.release()
+        return
     if context:
         logger.info("Closing Playwright browser context.")
-        await context.close()
+        try:
+            await context.close()
+        finally:
+            if context in _open_contexts:
+                _open_contexts.discard(context)
+                _context_slots.release()
 
 async def close_playwright_browser_instances():
     """
-    Closes all cached Playwright browser instances and the Playwright API.
+    Closes all pooled Playwright browser instances and the Playwright API.
     This should be called when the application is shutting down.
     """
     global _playwright_instance
-    global _browser_cache
+    global _persistent_context
 
     if _playwright_instance:
-        logger.info("Closing all cached Playwright browser instances.")
-        for browser_type, browser in list(_browser_cache.items()): # Iterate on a copy
-            if browser.is_connected():
-                await browser.close()
-            del _browser_cache[browser_type] # Remove from cache
+        if _persistent_context is not None:
+            logger.info("Closing the persistent Playwright browser context.")
+            await _persistent_context.close()
+            _persistent_context = None
+        # Idle reusable contexts are closed together with their browsers
+        _idle_contexts.clear()
+        _reusable_contexts.clear()
+        logger.info("Closing all pooled Playwright browser instances.")
+        for browser_type, pool in list(_browser_pools.items()): # Iterate on a copy
+            await pool.close()
+            del _browser_pools[browser_type] # Remove the emptied pool
 
         logger.info("Stopping Playwright API.")
         await _playwright_instance.stop()
@@ -85,52 +647,31 @@ async def close_playwright_browser_instances():
 
 # CLI test runner for Playwright
 if __name__ == "__main__":
-    import asyncio
-
-    async def test_browsers():
-        print("Testing Chromium headless browser...")
-        context, page = None, None
-        try:
-            context, page = await get_browser_context_and_page("chromium")
-            await page.goto("http://www.example.com")
-            title = await page.title()
-            print(f"Chromium Title: {title}")
-            print("Chromium test successful.")
-        except Exception as e:
-            print(f"Chromium test failed: {e}")
-        finally:
-            if context:
-                await close_browser_context(context)
-
-        print("\nTesting Firefox headless browser...")
+    async def _test_one(browser_type: BrowserType) -> str:
+        """Opens a page on the given browser type, loads example.com and returns its title."""
         context, page = None, None
         try:
-            context, page = await get_browser_context_and_page("firefox")
+            context, page = await get_browser_context_and_page(browser_type)
             await page.goto("http://www.example.com")
-            title = await page.title()
-            print(f"Firefox Title: {title}")
-            print("Firefox test successful.")
-        except Exception as e:
-            print(f"Firefox test failed: {e}")
+            return await page.title()
         finally:
             if context:
-                await close_browser_context(context)
+                await close_browser_context(context, page)
 
-        print("\nTesting WebKit headless browser...")
-        context, page = None, None
-        try:
-            context, page = await get_browser_context_and_page("webkit")
-            await page.goto("http://www.example.com")
-            title = await page.title()
-            print(f"WebKit Title: {title}")
-            print("WebKit test successful.")
-        except Exception as e:
-            print(f"WebKit test failed: {e}")
-        finally:
-            if context:
-                await close_browser_context(context)
+    async def test_browsers():
+        # The three browsers launch and load concurrently, which also exercises the pool's
+        # shared launch lock
+        browser_types: Tuple[BrowserType, ...] = ("chromium", "firefox", "webkit")
+        print(f"Testing {', '.join(browser_types)} headless browsers concurrently...")
+        results = await asyncio.gather(*(_test_one(bt) for bt in browser_types), return_exceptions=True)
+        for browser_type, result in zip(browser_types, results):
+            if isinstance(result, BaseException):
+                print(f"{browser_type} test failed: {result}")
+            else:
+                print(f"{browser_type} Title: {result}")
+                print(f"{browser_type} test successful.")
 
         await close_playwright_browser_instances()
 
 
-    asyncio.run(test_browsers())
\ No newline at end of file
+    asyncio.run(test_browsers())
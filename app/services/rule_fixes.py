@@ -0,0 +1,78 @@
+# backend/app/services/rule_fixes.py
+
+from typing import Dict
+
+# Canonical fixes for common Axe-core rules, keyed by Axe rule id.
+# These rules have one well-known remedy (see the Deque University rule pages), so the analyzer
+# attaches these suggestions directly instead of asking Gemini to write the same advice again.
+# Rules not listed here still get AI-generated suggestions.
+RULE_FIXES: Dict[str, Dict[str, str]] = {
+    "image-alt": {
+        "short_fix": "Add alt text to the image.",
+        "detailed_fix": "Give every `<img>` an `alt` attribute that conveys the image's content or purpose (e.g., `<img src=\"logo.png\" alt=\"Company name\">`). If the image is purely decorative, use an empty `alt=\"\"` so screen readers skip it."
+    },
+    "input-image-alt": {
+        "short_fix": "Add alt text to the image button.",
+        "detailed_fix": "`<input type=\"image\">` acts as a button, so its `alt` attribute must describe the action it performs (e.g., `<input type=\"image\" src=\"search.png\" alt=\"Search\">`), not the picture itself."
+    },
+    "color-contrast": {
+        "short_fix": "Increase the contrast between text and background colors.",
+        "detailed_fix": "Adjust the text `color` and/or `background-color` so the contrast ratio is at least 4.5:1 for normal text (3:1 for large text, 18pt or 14pt bold). Verify combinations with a contrast checker such as WebAIM's, and check hover, focus and active states too."
+    },
+    "html-has-lang": {
+        "short_fix": "Add a `lang` attribute to the `<html>` element.",
+        "detailed_fix": "Declare the page's primary language on the root element, e.g. `<html lang=\"en\">`, so screen readers use the correct pronunciation rules."
+    },
+    "html-lang-valid": {
+        "short_fix": "Use a valid language code in the `lang` attribute.",
+        "detailed_fix": "Set the `<html>` element's `lang` attribute to a valid BCP 47 language tag such as `en`, `en-US` or `fr`. Misspelled or made-up codes are ignored by assistive technologies."
+    },
+    "document-title": {
+        "short_fix": "Add a descriptive `<title>` to the page.",
+        "detailed_fix": "Include a non-empty `<title>` element inside `<head>` that describes the page's topic or purpose (e.g., `<title>Contact us - Example Corp</title>`). It is the first thing screen readers announce and identifies the page in tabs and history."
+    },
+    "label": {
+        "short_fix": "Associate a label with the form field.",
+        "detailed_fix": "Give each form field an accessible name: a `<label for=\"field_id\">` matching the field's `id`, a `<label>` wrapping the field, or an `aria-label`/`aria-labelledby` attribute. Placeholder text alone is not a label."
+    },
+    "link-name": {
+        "short_fix": "Give the link discernible text.",
+        "detailed_fix": "Make sure every `<a href>` has text content that describes its destination. For icon-only links, add visually hidden text or an `aria-label` (e.g., `<a href=\"/cart\" aria-label=\"Shopping cart\">`); for image links, give the image a meaningful `alt`."
+    },
+    "button-name": {
+        "short_fix": "Give the button discernible text.",
+        "detailed_fix": "Every `<button>` (and `role=\"button\"` element) needs text content, an `aria-label`, or an `aria-labelledby` reference that states its action. For icon buttons, add `aria-label` (e.g., `<button aria-label=\"Close dialog\">`)."
+    },
+    "frame-title": {
+        "short_fix": "Add a `title` attribute to the frame.",
+        "detailed_fix": "Give each `<iframe>` and `<frame>` a unique `title` attribute describing its content (e.g., `<iframe src=\"map.html\" title=\"Office location map\">`) so screen reader users can decide whether to enter it."
+    },
+    "page-has-heading-one": {
+        "short_fix": "Add a level-one heading to the page.",
+        "detailed_fix": "Add an `<h1>` that describes the main content of the page, typically at the start of the `<main>` region. Screen reader users often jump to the first `<h1>` to find the page's primary content."
+    },
+    "heading-order": {
+        "short_fix": "Do not skip heading levels.",
+        "detailed_fix": "Headings should increase by only one level at a time (e.g., `<h2>` followed by `<h3>`, not `<h4>`). Choose heading levels by document structure and style their size with CSS instead."
+    },
+    "landmark-one-main": {
+        "short_fix": "Add a `<main>` landmark to the page.",
+        "detailed_fix": "Wrap the page's primary content in a single `<main>` element (or an element with `role=\"main\"`) so assistive technology users can jump straight to it."
+    },
+    "region": {
+        "short_fix": "Place all content inside landmark regions.",
+        "detailed_fix": "Put page content inside landmarks such as `<header>`, `<nav>`, `<main>` and `<footer>` so that screen reader users can navigate by region and no content is left outside them."
+    },
+    "list": {
+        "short_fix": "Only use `<li>` elements directly inside lists.",
+        "detailed_fix": "`<ul>` and `<ol>` may only contain `<li>`, `<script>` or `<template>` elements as direct children. Move other elements inside an `<li>` so the list structure is announced correctly."
+    },
+    "listitem": {
+        "short_fix": "Place `<li>` elements inside a `<ul>` or `<ol>`.",
+        "detailed_fix": "Every `<li>` must have a `<ul>`, `<ol>` or `<menu>` parent; otherwise screen readers cannot announce it as part of a list. Wrap stray list items in the appropriate list element."
+    },
+    "meta-viewport": {
+        "short_fix": "Allow users to zoom the page.",
+        "detailed_fix": "Remove `user-scalable=no` from the `<meta name=\"viewport\">` tag and do not set `maximum-scale` below 5, so users with low vision can zoom the content."
+    },
+}
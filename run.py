@@ -11,4 +11,19 @@ if __name__ == "__main__":
     current_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(current_dir)
 
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # On shutdown uvicorn waits at most this long for in-flight requests (an analysis can take
+    # a while) before running the app's lifespan shutdown, which closes MongoDB, the HTTP
+    # clients and the Playwright browsers instead of leaving them for the OS to reap.
+    # loop/http stay on uvicorn's "auto": uvloop (requirements.txt, not available on Windows) and
+    # httptools are picked up whenever they are installed.
+    # The reloader only watches the app package (with watchfiles, from requirements.txt, that is
+    # inotify-based rather than polling), so edits to tests, static assets or caches do not restart the server.
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        reload_dirs=["app"],
+        reload_excludes=["__pycache__/*"],
+        timeout_graceful_shutdown=15
+    )
\ No newline at end of file
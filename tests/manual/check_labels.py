@@ -0,0 +1,45 @@
+# backend/tests/manual/check_labels.py
+
+# Manual smoke run for app/rules/labels.py, moved out of the rule module so the
+# module imported by the server carries no demo code.
+# Run from the backend directory: python -m tests.manual.check_labels
+
+from app.rules.labels import check_form_labels
+
+if __name__ == "__main__":
+    print("--- Testing backend/app/rules/labels.py locally ---")
+
+    # Test 1: Input with no label or aria-label (bad)
+    html_no_label = "<html><body><input type='text' id='username'></body></html>"
+    issues_no_label = check_form_labels(html_no_label)
+    print(f"\nTest 1 (No Label): Found {len(issues_no_label)} issues.")
+    for issue in issues_no_label:
+        print(issue.model_dump_json(indent=2))
+
+    # Test 2: Input with associated label (good)
+    html_good_label = "<html><body><label for='email'>Email:</label><input type='email' id='email'></body></html>"
+    issues_good_label = check_form_labels(html_good_label)
+    print(f"\nTest 2 (Good Label): Found {len(issues_good_label)} issues.")
+    for issue in issues_good_label:
+        print(issue.model_dump_json(indent=2))
+
+    # Test 3: Input with aria-label (good)
+    html_aria_label = "<html><body><input type='password' aria-label='Password'></body></html>"
+    issues_aria_label = check_form_labels(html_aria_label)
+    print(f"\nTest 3 (Aria Label): Found {len(issues_aria_label)} issues.")
+    for issue in issues_aria_label:
+        print(issue.model_dump_json(indent=2))
+
+    # Test 4: Input with placeholder but no proper label (bad)
+    html_placeholder_only = "<html><body><input type='search' id='search' placeholder='Search...'></body></html>"
+    issues_placeholder = check_form_labels(html_placeholder_only)
+    print(f"\nTest 4 (Placeholder Only): Found {len(issues_placeholder)} issues.")
+    for issue in issues_placeholder:
+        print(issue.model_dump_json(indent=2))
+
+    # Test 5: Hidden input (should be ignored)
+    html_hidden_input = "<html><body><input type='hidden' name='csrf' value='token'></body></html>"
+    issues_hidden = check_form_labels(html_hidden_input)
+    print(f"\nTest 5 (Hidden Input): Found {len(issues_hidden)} issues.")
+    for issue in issues_hidden:
+        print(issue.model_dump_json(indent=2))
@@ -0,0 +1,273 @@
+# backend/tests/test_rules.py
+
+# Pins the issue ids and counts the custom rules report on small, representative pages.
+# Run from the backend directory: python -m pytest -q
+
+import random
+
+import pytest
+
+from app.rules._parse import parse
+from app.rules.alt_text import check_alt_text
+from app.rules.combined import check_all
+from app.rules.contrast import _SAFE_SUM_DIFFERENCE, REQUIRED_RATIO, check_color_contrast, get_contrast_ratio
+from app.rules.descriptive_link_text import check_descriptive_link_text
+from app.rules.document_language import check_document_language
+from app.rules.empty_interactive import check_empty_interactive_elements
+from app.rules.headings import check_heading_structure
+from app.rules.labels import check_form_labels
+from app.rules.media_captions import check_media_captions
+
+
+def ids(issues):
+    """The issue ids, in the order the rule reported them."""
+    return [issue.id for issue in issues]
+
+
+# --- Form labels ---
+
+@pytest.mark.parametrize("html", [
+    "<input type='text' id='username'>",
+    "<input id='email'><label for='other'>Email</label>", # label points at another field
+    "<textarea></textarea>",
+    "<select><option>One</option></select>",
+    "<input type='TEXT'>", # types are matched case-insensitively
+])
+def test_unlabeled_fields_are_reported(html):
+    assert ids(check_form_labels(f"<html><body>{html}</body></html>")) == ["custom-missing-form-label"]
+
+
+@pytest.mark.parametrize("html", [
+    "<label for='email'>Email:</label><input type='email' id='email'>",
+    "<input type='password' aria-label='Password'>",
+    "<span id='q-label'>Query</span><input aria-labelledby='q-label'>",
+    "<input type='hidden' name='csrf' value='token'>",
+    "<input type='submit'><input type='Reset'><input type='button'><input type='image' alt='Go'>",
+    "<p>No form fields at all</p>",
+])
+def test_labeled_or_exempt_fields_are_not_reported(html):
+    assert check_form_labels(f"<html><body>{html}</body></html>") == []
+
+
+def test_placeholder_is_not_a_label():
+    issues = check_form_labels("<html><body><input type='search' placeholder='Search...'></body></html>")
+    assert ids(issues) == ["custom-missing-form-label"]
+    assert "placeholder" in issues[0].description
+
+
+def test_each_unlabeled_field_gets_its_own_issue():
+    html = "<form><input id='a'><label for='b'>B</label><input id='b'><input id='c'><textarea></textarea></form>"
+    issues = check_form_labels(html)
+    assert ids(issues) == ["custom-missing-form-label"] * 3
+    assert [issue.nodes[0].target for issue in issues] == [["input"], ["input"], ["textarea"]]
+
+
+# --- Media captions ---
+
+@pytest.mark.parametrize("html, expected", [
+    ("<video controls src='movie.mp4'></video>",
+     ["custom-video-missing-captions", "custom-video-missing-descriptions"]),
+    ("<video><track kind='captions' src='c.vtt'></video>",
+     ["custom-video-missing-descriptions"]),
+    ("<video><track kind='descriptions' src='d.vtt'></video>",
+     ["custom-video-missing-captions"]),
+    ("<video><track kind='captions' src='c.vtt'><track kind='descriptions' src='d.vtt'></video>", []),
+    ("<video><track kind='subtitles' src='s.vtt'></video>",
+     ["custom-video-missing-captions", "custom-video-missing-descriptions"]),
+    ("<audio controls src='audio.mp3'></audio>", ["custom-audio-missing-transcript"]),
+    ("<audio><track kind='captions' src='t.vtt'></audio>", []),
+    # Tracks inside fallback content do not belong to the media element
+    ("<video><div><track kind='captions' src='c.vtt'></div></video>",
+     ["custom-video-missing-captions", "custom-video-missing-descriptions"]),
+])
+def test_media_tracks(html, expected):
+    assert ids(check_media_captions(f"<html><body>{html}</body></html>")) == expected
+
+
+def test_media_issues_are_reported_per_element():
+    html = "<html><body><video></video><audio></audio><video></video></body></html>"
+    assert ids(check_media_captions(html)) == [
+        "custom-video-missing-captions", "custom-video-missing-descriptions",
+        "custom-audio-missing-transcript",
+        "custom-video-missing-captions", "custom-video-missing-descriptions",
+    ]
+
+
+# --- Headings ---
+
+@pytest.mark.parametrize("html, expected", [
+    ("<h1>Title</h1><h2>Section</h2><h3>Sub</h3><h2>Section</h2>", []),
+    ("<h1>Title</h1><h3>Sub</h3>", ["custom-skipped-heading-level-h2"]),
+    ("<h1>Title</h1><h4>Detail</h4>", ["custom-skipped-heading-level-h2"]),
+    ("<h1>Title</h1><h2>Section</h2><h4>Detail</h4>", ["custom-skipped-heading-level-h3"]),
+    # Only the first skip is reported
+    ("<h1>Title</h1><h3>Sub</h3><h5>Detail</h5>", ["custom-skipped-heading-level-h2"]),
+    ("<h2>Section</h2><p>Content</p>", ["custom-missing-h1"]),
+    ("<h2>Section</h2><h3>Sub</h3>", ["custom-missing-h1"]),
+    ("<h2>Section</h2><h4>Detail</h4>", ["custom-missing-h1", "custom-skipped-heading-level-h3"]),
+    ("<p>No headings</p>", ["custom-missing-h1"]),
+])
+def test_heading_structure(html, expected):
+    assert ids(check_heading_structure(f"<html><body>{html}</body></html>")) == expected
+
+
+def test_skipped_heading_points_at_both_headings():
+    issue, = check_heading_structure("<html><body><h1>Title</h1><h3>Sub</h3></body></html>")
+    assert [node.target for node in issue.nodes] == [["h1"], ["h3"]]
+
+
+# --- Colour contrast ---
+
+@pytest.mark.parametrize("style, expected_count", [
+    ("color:#FFF; background-color:#000;", 0), # passes through the channel-sum shortcut
+    ("color:#000000; background-color:#ffffff;", 0),
+    ("color:#AAA; background-color:#FFF;", 1),
+    ("color:#777; background-color:#DDD;", 1),
+    ("color:#777; background-color:#777;", 1), # identical colours
+    ("color:#767676; background-color:#FFFFFF;", 0), # 4.54:1, just above the threshold
+    ("background-color:#FFF; color:#AAA", 1), # declaration order does not matter
+    ("background-color:#AAA;", 0), # no text colour: not checked
+    ("color:#AAA;", 0), # no background colour: not checked
+    ("color:red; background-color:#FFF;", 0), # non-hex colours are not checked
+])
+def test_color_contrast(style, expected_count):
+    issues = check_color_contrast(f'<html><body><p style="{style}">Some text</p></body></html>')
+    assert ids(issues) == ["custom-color-contrast-low"] * expected_count
+
+
+def test_contrast_skips_elements_without_text():
+    html = '<html><body><div style="color:#AAA; background-color:#FFF;">  </div></body></html>'
+    assert check_color_contrast(html) == []
+
+
+def test_contrast_reports_identical_colours_as_one_to_one():
+    issue, = check_color_contrast('<html><body><span style="color:#123; background-color:#112233;">x</span></body></html>')
+    assert "1.00:1" in issue.description
+
+
+def test_contrast_issues_follow_document_order():
+    html = """<html><body>
+        <p style="color:#AAA; background-color:#FFF;">first</p>
+        <p style="color:#000; background-color:#FFF;">fine</p>
+        <span style="color:#AAA; background-color:#FFF;">second</span>
+    </body></html>"""
+    assert [issue.nodes[0].target for issue in check_color_contrast(html)] == [["p"], ["span"]]
+
+
+def test_channel_sum_shortcut_never_hides_a_failure():
+    # The shortcut skips the WCAG formula for pairs whose channel sums differ by more than
+    # _SAFE_SUM_DIFFERENCE; such pairs must always meet the required ratio.
+    # Random pairs almost never differ that much, so draw dark and light colours separately.
+    rng = random.Random(0)
+    checked = 0
+    while checked < 5000:
+        dark = tuple(rng.randrange(64) for _ in range(3))
+        light = tuple(rng.randrange(192, 256) for _ in range(3))
+        if sum(light) - sum(dark) > _SAFE_SUM_DIFFERENCE:
+            assert get_contrast_ratio(dark, light) >= REQUIRED_RATIO, (dark, light)
+            checked += 1
+
+
+def test_contrast_ratio_is_symmetric_and_matches_wcag():
+    assert get_contrast_ratio((0, 0, 0), (255, 255, 255)) == pytest.approx(21.0)
+    assert get_contrast_ratio((255, 255, 255), (0, 0, 0)) == pytest.approx(21.0)
+    assert get_contrast_ratio((118, 118, 118), (255, 255, 255)) == pytest.approx(4.54, abs=0.01)
+
+
+# --- Link text ---
+
+@pytest.mark.parametrize("text", [
+    "click here", "Click Here", "Read more", "read  more.", "learn More", "Find out more!",
+    "Details", "here", "More", "  more?  ",
+])
+def test_non_descriptive_links_are_reported(text):
+    html = f'<html><body><a href="/x">{text}</a></body></html>'
+    assert ids(check_descriptive_link_text(html)) == ["custom-non-descriptive-link-text"]
+
+
+@pytest.mark.parametrize("html", [
+    '<a href="/products">View All Products</a>',
+    '<a href="/pricing">More about pricing</a>',
+    '<a href="/x">Somewhere</a>',
+    '<a href="/login" aria-label="Login to your account">click here</a>',
+    '<a href="/privacy" aria-labelledby="privacy-text">here</a>',
+    '<a name="anchor">here</a>', # not a link without href
+    '<a href="#"></a>', # empty links belong to the empty-interactive rule
+])
+def test_descriptive_or_named_links_are_not_reported(html):
+    assert check_descriptive_link_text(f"<html><body>{html}</body></html>") == []
+
+
+def test_link_text_is_read_across_child_elements():
+    html = '<html><body><a href="/x"><span>Read</span>\n  <em>more</em></a></body></html>'
+    assert ids(check_descriptive_link_text(html)) == ["custom-non-descriptive-link-text"]
+
+
+# --- Alt text, empty interactive elements, document language ---
+
+@pytest.mark.parametrize("html, expected_count", [
+    ("<img src='a.png' alt='A meaningful description'>", 0),
+    ("<img src='b.png'>", 1),
+    ("<img src='c.png' alt=' '>", 1),
+    ("<img src='d.png' alt='valid logo'><img src='e.png'>", 1),
+])
+def test_alt_text(html, expected_count):
+    issues = check_alt_text(f"<html><body>{html}</body></html>")
+    assert ids(issues) == ["custom-image-alt-missing"] * expected_count
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<a href="#"></a>', ["custom-empty-a"]),
+    ('<a href="#">     </a>', ["custom-empty-a"]),
+    ("<button></button>", ["custom-empty-button"]),
+    ('<a href="#">Click Me</a>', []),
+    ('<button aria-label="Close dialog"><span class="icon-x"></span></button>', []),
+])
+def test_empty_interactive_elements(html, expected):
+    assert ids(check_empty_interactive_elements(f"<html><body>{html}</body></html>")) == expected
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<html lang="en"><body><p>Hello</p></body></html>', []),
+    ("<html><body><p>Hello</p></body></html>", ["custom-missing-lang-attribute"]),
+    ('<html lang=""><body><p>Hello</p></body></html>', ["custom-missing-lang-attribute"]),
+    ('<html lang="  "><body><p>Hello</p></body></html>', ["custom-missing-lang-attribute"]),
+    ("", ["custom-missing-html-tag"]),
+])
+def test_document_language(html, expected):
+    assert ids(check_document_language(html)) == expected
+
+
+# --- Combined single-pass walk ---
+
+_MIXED_PAGE = """<html><body>
+    <h2>Section</h2><h4>Detail</h4>
+    <p style="color:#AAA; background-color:#FFF;">Low contrast</p>
+    <a href="/more">Read more</a>
+    <a href="/empty"></a>
+    <button></button>
+    <div style="color:#000; background-color:#FFF;"><a href="/x">click here</a></div>
+</body></html>"""
+
+
+def test_check_all_matches_the_individual_rules():
+    tree = parse(_MIXED_PAGE)
+    sequential = (
+        check_heading_structure(_MIXED_PAGE, tree=tree)
+        + check_color_contrast(_MIXED_PAGE, tree=tree)
+        + check_empty_interactive_elements(_MIXED_PAGE, tree=tree)
+        + check_document_language(_MIXED_PAGE, tree=tree)
+        + check_descriptive_link_text(_MIXED_PAGE, tree=tree)
+    )
+    combined = check_all(_MIXED_PAGE, tree=tree)
+    assert ids(combined) == ids(sequential) == [
+        "custom-missing-h1",
+        "custom-skipped-heading-level-h3",
+        "custom-color-contrast-low",
+        "custom-empty-a",
+        "custom-empty-button",
+        "custom-missing-lang-attribute",
+        "custom-non-descriptive-link-text",
+        "custom-non-descriptive-link-text",
+    ]
+    assert [issue.model_dump() for issue in combined] == [issue.model_dump() for issue in sequential]